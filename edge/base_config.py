@@ -8,7 +8,7 @@ from typing import Dict, Optional
 
 class DeviceConfig:
     def __init__(self, device_type: str = None):
-        self.base_path = Path("devices")
+        self.base_path = Path(__file__).resolve().parent / "devices"
         self.device_type = device_type or self._detect_device_type()
         self.config = self._load_config()
         
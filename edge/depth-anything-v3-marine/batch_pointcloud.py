@@ -1,78 +1,172 @@
 #!/usr/bin/env python3
 
+"""
+Batch Depth Maps to Point Cloud Converter
+Converts every *_depth.png / *_original.jpg pair across a process pool
+"""
+
 import os
-import numpy as np
 import cv2
 import glob
+import json
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+from pointcloud_io import save_ply
+from pointcloud_projector import get_projector
+from pointcloud_voxel import VoxelGrid, voxel_downsample
+
+# Defaults of the original turtle batch: every 4th pixel, 0-8m depth, keep 0.2-6m
+DEFAULT_SETTINGS = {"stride": 4, "depth_scale": 8.0, "min_depth": 0.2, "max_depth": 6.0}
+
+# Fused clouds: 2cm voxels, coarsened as needed to stay under 5M points
+DEFAULT_FUSE_VOXEL_SIZE = 0.02
+DEFAULT_FUSE_MAX_POINTS = 5_000_000
+
+def find_frame_pairs(input_dir):
+    """(frame_base, depth_path, original_path) for every depth map with an original image"""
+    pairs = []
+    for depth_path in sorted(glob.glob(os.path.join(input_dir, "**", "*_depth.png"), recursive=True)):
+        frame_base = os.path.basename(depth_path)[:-len("_depth.png")]
+        original_path = depth_path[:-len("_depth.png")] + "_original.jpg"
+        if not os.path.exists(original_path):
+            print(f"Skipping {frame_base} - no original image")
+            continue
+        pairs.append((frame_base, depth_path, original_path))
+    return pairs
+
+def convert_frame(pair, output_dir, settings, binary=True, voxel_size=None, fuse=False):
+    """Convert one depth/original pair and write its PLY (runs in a worker)
+
+    With voxel_size the cloud is voxel-downsampled first. With fuse nothing
+    is written; the frame's VoxelGrid is returned for the caller to merge.
+    """
+    frame_base, depth_path, original_path = pair
 
-def depth_to_pointcloud_simple(depth_map, rgb_image):
-    """Simple depth to point cloud conversion"""
-    h, w = depth_map.shape
-    
-    # Camera parameters
-    fx = fy = min(w, h) * 0.7
-    cx, cy = w // 2, h // 2
-    
-    # Downsample for performance
-    step = 4
-    depth_small = depth_map[::step, ::step]
-    rgb_small = rgb_image[::step, ::step]
-    h_small, w_small = depth_small.shape
-    
-    u, v = np.meshgrid(np.arange(w_small), np.arange(h_small))
-    u, v = u * step, v * step
-    
-    z = depth_small.astype(np.float32) / 255.0 * 8.0
-    x = (u - cx) * z / fx
-    y = (v - cy) * z / fy
-    
-    points = np.stack([x.flatten(), y.flatten(), z.flatten()], axis=1)
-    colors = rgb_small.reshape(-1, 3)
-    
-    valid = (z.flatten() > 0.2) & (z.flatten() < 6.0)
-    return points[valid], colors[valid]
-
-def save_ply_simple(points, colors, filename):
-    """Save PLY file"""
-    with open(filename, "w") as f:
-        f.write(f"ply\nformat ascii 1.0\nelement vertex {len(points)}\n")
-        f.write("property float x\nproperty float y\nproperty float z\n")
-        f.write("property uchar red\nproperty uchar green\nproperty uchar blue\nend_header\n")
-        
-        for point, color in zip(points, colors):
-            x, y, z = point
-            r, g, b = color.astype(int)
-            f.write(f"{x:.3f} {y:.3f} {z:.3f} {r} {g} {b}\n")
-
-# Process first 10 frames
-print("Processing first 10 turtle frames...")
-os.makedirs("turtle_pointclouds", exist_ok=True)
-
-depth_files = sorted(glob.glob("./output/turtle_depth_trt/*_depth.png"))[:10]
-
-for i, depth_file in enumerate(depth_files):
-    frame_base = os.path.basename(depth_file).replace("_depth.png", "")
-    original_file = depth_file.replace("_depth.png", "_original.jpg")
-    
-    if not os.path.exists(original_file):
-        print(f"Skipping {frame_base} - no original image")
-        continue
-    
-    print(f"Processing {i+1}/10: {frame_base}")
-    
     # Load images
-    depth_map = cv2.imread(depth_file, cv2.IMREAD_GRAYSCALE)
-    rgb_image = cv2.imread(original_file)
+    depth_map = cv2.imread(depth_path, cv2.IMREAD_GRAYSCALE)
+    rgb_image = cv2.imread(original_path)
     rgb_image = cv2.cvtColor(rgb_image, cv2.COLOR_BGR2RGB)
-    
-    # Generate point cloud
-    points, colors = depth_to_pointcloud_simple(depth_map, rgb_image)
-    
-    # Save PLY
-    ply_file = f"turtle_pointclouds/{frame_base}.ply"
-    save_ply_simple(points, colors, ply_file)
-    
-    print(f"  -> {len(points):,} points saved to {ply_file}")
-
-print("\nBatch processing complete!")
-print("Check turtle_pointclouds/ directory for PLY files")
+
+    # Projectors are cached per process, so each worker builds its rays once
+    h, w = depth_map.shape
+    points, colors = get_projector(w, h, **settings).project(depth_map, rgb_image)
+    if fuse:
+        grid = VoxelGrid(voxel_size).add(points, colors)
+        return {"frame": frame_base, "num_points": len(grid), "voxels": grid}
+    if voxel_size:
+        points, colors = voxel_downsample(points, colors, voxel_size)
+
+    ply_file = os.path.join(output_dir, f"{frame_base}.ply")
+    save_ply(points, colors, ply_file, binary=binary)
+
+    return {"frame": frame_base, "ply_file": ply_file, "num_points": len(points)}
+
+def _init_worker():
+    # One process per core already; keep OpenCV from oversubscribing
+    cv2.setNumThreads(1)
+
+def convert_frames(pairs, output_dir, settings=None, workers=None, chunk_size=None, binary=True,
+                   voxel_size=None, fusion=None):
+    """Convert frame pairs in a process pool, returning per-frame results in order
+
+    When a VoxelGrid is passed as fusion, frames are merged into it in order
+    as they arrive instead of being written one PLY each.
+    """
+    settings = {**DEFAULT_SETTINGS, **(settings or {})}
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pairs)))
+    # A few chunks per worker balances load without per-frame IPC
+    chunk_size = chunk_size or max(1, len(pairs) // (workers * 4))
+    os.makedirs(output_dir, exist_ok=True)
+
+    if fusion is not None:
+        # Workers reduce their frames at the fused voxel size before merging
+        voxel_size = fusion.voxel_size
+    convert = partial(convert_frame, output_dir=output_dir, settings=settings, binary=binary,
+                      voxel_size=voxel_size, fuse=fusion is not None)
+    if workers == 1:
+        results = map(convert, pairs)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(workers, initializer=_init_worker)
+        results = pool.map(convert, pairs, chunksize=chunk_size)
+
+    try:
+        converted = []
+        for i, result in enumerate(results):
+            if fusion is not None:
+                fusion.merge(result.pop("voxels"))
+            converted.append(result)
+            print(f"Processing {i+1}/{len(pairs)}: {result['frame']} -> {result['num_points']:,} points")
+        return converted
+    finally:
+        if pool is not None:
+            pool.shutdown(cancel_futures=True)
+
+def write_metadata(input_dir, output_dir, results, **extra):
+    """Write pointcloud_metadata.json describing a batch"""
+    metadata = {
+        "source_directory": input_dir,
+        "output_directory": output_dir,
+        "total_frames": len(results),
+        "total_points": sum(r["num_points"] for r in results),
+        **extra,
+        "results": results
+    }
+
+    metadata_file = os.path.join(output_dir, "pointcloud_metadata.json")
+    with open(metadata_file, "w") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata_file
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert all depth/original frame pairs to point clouds in parallel")
+    parser.add_argument("input_dir", nargs="?", default="./output", help="Directory searched for *_depth.png files")
+    parser.add_argument("--output-dir", default="turtle_pointclouds", help="Output directory")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: all CPUs)")
+    parser.add_argument("--chunk-size", type=int, default=None, help="Frames handed to a worker at a time")
+    parser.add_argument("--stride", type=int, default=DEFAULT_SETTINGS["stride"], help="Use every Nth pixel")
+    parser.add_argument("--voxel-size", type=float, default=None,
+                        help="Voxel-downsample each frame to this edge length in meters")
+    parser.add_argument("--fuse", action="store_true", help="Fuse all frames into one fused.ply instead of one PLY per frame")
+    parser.add_argument("--max-points", type=int, default=DEFAULT_FUSE_MAX_POINTS,
+                        help="Upper bound on fused cloud size; voxels grow to stay under it")
+    parser.add_argument("--limit", type=int, default=None, help="Only convert the first N frames")
+    parser.add_argument("--ascii", action="store_true", help="Write ASCII PLY instead of binary")
+
+    args = parser.parse_args()
+
+    pairs = find_frame_pairs(args.input_dir)[:args.limit]
+    if not pairs:
+        print(f"Error: No depth/original pairs found in {args.input_dir}")
+        return
+
+    print(f"Converting {len(pairs)} frames...")
+    start = time.time()
+    settings = {**DEFAULT_SETTINGS, "stride": args.stride}
+    voxel_size = args.voxel_size or (DEFAULT_FUSE_VOXEL_SIZE if args.fuse else None)
+    fusion = VoxelGrid(voxel_size, args.max_points) if args.fuse else None
+    results = convert_frames(pairs, args.output_dir, settings, args.workers, args.chunk_size, binary=not args.ascii,
+                             voxel_size=voxel_size, fusion=fusion)
+
+    # Fused clouds may coarsen further to fit max_points; "fused" has the final size
+    extra = {"settings": {**settings, "voxel_size": voxel_size}}
+    if fusion is not None:
+        # Frames are fused in the camera frame; there is no pose source yet
+        ply_file = os.path.join(args.output_dir, "fused.ply")
+        points, colors = fusion.to_arrays()
+        save_ply(points, colors, ply_file, binary=not args.ascii)
+        extra["fused"] = {"ply_file": ply_file, "num_points": len(points), "voxel_size": fusion.voxel_size}
+        print(f"Fused {len(results)} frames -> {len(points):,} points ({fusion.voxel_size:g}m voxels)")
+    elapsed = time.time() - start
+
+    metadata_file = write_metadata(args.input_dir, args.output_dir, results, processing_time_s=round(elapsed, 2), **extra)
+
+    print("\nBatch processing complete!")
+    print(f"Converted {len(results)} frames in {elapsed:.1f}s")
+    print(f"Metadata: {metadata_file}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+"""
+Point cloud I/O shared by the depth-to-point-cloud scripts
+Vertices are packed into a NumPy structured array and written in one go;
+binary PLY and NPY files are read back memory-mapped
+"""
+
+from itertools import chain, islice
+
+import numpy as np
+
+# Explicit little-endian types so binary files are the same on any host
+VERTEX_DTYPE = np.dtype([
+    ('x', '<f4'), ('y', '<f4'), ('z', '<f4'),
+    ('red', 'u1'), ('green', 'u1'), ('blue', 'u1')
+])
+POSITION_DTYPE = np.dtype([('x', '<f4'), ('y', '<f4'), ('z', '<f4')])
+
+# PLY type names (and their sized aliases) to NumPy types
+PLY_NUMPY_TYPES = {
+    'char': 'i1', 'int8': 'i1', 'uchar': 'u1', 'uint8': 'u1',
+    'short': 'i2', 'int16': 'i2', 'ushort': 'u2', 'uint16': 'u2',
+    'int': 'i4', 'int32': 'i4', 'uint': 'u4', 'uint32': 'u4',
+    'float': 'f4', 'float32': 'f4', 'double': 'f8', 'float64': 'f8'
+}
+PLY_BYTE_ORDER = {'binary_little_endian': '<', 'binary_big_endian': '>', 'ascii': '='}
+
+# Vertices formatted per string operation when writing ASCII
+ASCII_CHUNK = 65536
+
+# PLY property type names by NumPy kind and size
+PLY_TYPES = {
+    ('i', 1): 'char', ('u', 1): 'uchar',
+    ('i', 2): 'short', ('u', 2): 'ushort',
+    ('i', 4): 'int', ('u', 4): 'uint',
+    ('f', 4): 'float', ('f', 8): 'double'
+}
+
+
+def to_vertices(points, colors=None):
+    """Pack (N, 3) points and optional (N, 3) RGB colors into a vertex array"""
+    points = np.asarray(points)
+    if points.dtype.names:
+        return points
+
+    vertices = np.empty(len(points), dtype=VERTEX_DTYPE if colors is not None else POSITION_DTYPE)
+    vertices['x'], vertices['y'], vertices['z'] = points[:, 0], points[:, 1], points[:, 2]
+    if colors is not None:
+        colors = np.asarray(colors)
+        vertices['red'], vertices['green'], vertices['blue'] = colors[:, 0], colors[:, 1], colors[:, 2]
+    return vertices
+
+
+def ply_header(vertices, binary=True):
+    """PLY header describing a structured vertex array"""
+    lines = [
+        "ply",
+        f"format {'binary_little_endian' if binary else 'ascii'} 1.0",
+        f"element vertex {len(vertices)}"
+    ]
+    for name in vertices.dtype.names:
+        field = vertices.dtype.fields[name][0]
+        lines.append(f"property {PLY_TYPES[(field.kind, field.itemsize)]} {name}")
+    lines.append("end_header")
+    return "\n".join(lines) + "\n"
+
+
+def save_ply(points, colors, filename, binary=True, precision=6):
+    """Save a point cloud as PLY, binary_little_endian unless binary=False
+
+    points may also be a structured vertex array, in which case colors is
+    ignored.
+    """
+    vertices = to_vertices(points, colors)
+    if binary:
+        vertices = vertices.astype(vertices.dtype.newbyteorder('<'), copy=False)
+
+    with open(filename, "wb") as f:
+        f.write(ply_header(vertices, binary).encode("ascii"))
+        if binary:
+            vertices.tofile(f)
+        else:
+            row = " ".join(f"%.{precision}f" if vertices.dtype[name].kind == 'f' else "%d"
+                           for name in vertices.dtype.names) + "\n"
+            # One % per chunk instead of one formatted write per point
+            for start in range(0, len(vertices), ASCII_CHUNK):
+                chunk = vertices[start:start + ASCII_CHUNK].tolist()
+                f.write(((row * len(chunk)) % tuple(chain.from_iterable(chunk))).encode("ascii"))
+
+    return len(vertices)
+
+
+def read_ply_header(f):
+    """Parse a PLY header from a binary file object
+
+    Returns (format, vertex count, vertex dtype); the file is left at the
+    start of the body. Only the vertex element is described, and it has to
+    be the first element.
+    """
+    if f.readline().strip() != b"ply":
+        raise ValueError(f"Not a PLY file: {f.name}")
+
+    fmt, count, fields, element = None, None, [], None
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError(f"PLY header has no end_header: {f.name}")
+        words = line.decode("ascii").split()
+        if not words or words[0] in ("comment", "obj_info"):
+            continue
+        if words[0] == "end_header":
+            break
+        if words[0] == "format":
+            fmt = words[1]
+        elif words[0] == "element":
+            element = words[1]
+            if element == "vertex":
+                if count is not None or fields:
+                    raise ValueError(f"Vertex must be the first element: {f.name}")
+                count = int(words[2])
+            elif count is None:
+                raise ValueError(f"Vertex must be the first element: {f.name}")
+        elif words[0] == "property" and element == "vertex":
+            if words[1] == "list":
+                raise ValueError(f"List properties are not supported on vertices: {f.name}")
+            fields.append((words[2], PLY_NUMPY_TYPES[words[1]]))
+
+    if fmt not in PLY_BYTE_ORDER:
+        raise ValueError(f"Unknown PLY format {fmt}: {f.name}")
+    if count is None:
+        raise ValueError(f"PLY file has no vertex element: {f.name}")
+    order = PLY_BYTE_ORDER[fmt]
+    return fmt, count, np.dtype([(name, order + code) for name, code in fields])
+
+
+def load_ply(filename, mmap=True):
+    """Load the vertices of a PLY file as a structured array
+
+    Binary bodies are memory-mapped read-only unless mmap=False, so slicing
+    a large cloud only reads the pages it touches. ASCII bodies are parsed
+    in one vectorized pass.
+    """
+    with open(filename, "rb") as f:
+        fmt, count, dtype = read_ply_header(f)
+        offset = f.tell()
+        if fmt == "ascii":
+            text = b"".join(islice(f, count))
+            values = np.array(text.split(), dtype=np.float64).reshape(count, len(dtype.names))
+            vertices = np.empty(count, dtype=dtype)
+            for i, name in enumerate(dtype.names):
+                vertices[name] = values[:, i]
+            return vertices
+        if not mmap:
+            return np.fromfile(f, dtype=dtype, count=count)
+    if count == 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(filename, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+
+def save_npy(points, colors, filename):
+    """Save a point cloud as a structured vertex array in NPY format"""
+    vertices = to_vertices(points, colors)
+    np.save(filename, vertices)
+    return len(vertices)
+
+
+def load_pointcloud(filename, mmap=True):
+    """Load a .ply or .npy point cloud, memory-mapped where possible"""
+    if str(filename).endswith(".npy"):
+        return np.load(filename, mmap_mode="r" if mmap else None)
+    return load_ply(filename, mmap=mmap)
+
+
+def split_vertices(vertices):
+    """(N, 3) float32 points and (N, 3) uint8 colors, or None, from a vertex array"""
+    points = np.stack([vertices['x'], vertices['y'], vertices['z']], axis=1).astype(np.float32, copy=False)
+    colors = None
+    if all(name in vertices.dtype.names for name in ('red', 'green', 'blue')):
+        colors = np.stack([vertices['red'], vertices['green'], vertices['blue']], axis=1).astype(np.uint8, copy=False)
+    return points, colors
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""
+Depth map unprojection with precomputed ray grids
+The normalized rays, depth lookup and output buffers are built once per
+resolution, intrinsics and stride, then reused for every frame of a video
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+
+def default_intrinsics(width, height):
+    """Estimated (fx, fy, cx, cy) for marine video without calibration"""
+    fx = fy = min(width, height) * 0.7  # Conservative focal length
+    return fx, fy, width // 2, height // 2
+
+
+class PointCloudProjector:
+    """Unproject 8-bit depth maps of one size into camera-space points
+
+    Depth values d map to z = d / 255 * depth_scale and are kept when
+    min_depth < z < max_depth. Points and colors returned by project() are
+    views into buffers owned by the projector and are overwritten by the
+    next call; copy them to keep them.
+    """
+
+    def __init__(self, width, height, intrinsics=None, stride=1,
+                 depth_scale=10.0, min_depth=0.1, max_depth=8.0):
+        self.width, self.height, self.stride = width, height, stride
+        self.intrinsics = tuple(intrinsics) if intrinsics is not None else default_intrinsics(width, height)
+        fx, fy, cx, cy = self.intrinsics
+
+        # Normalized rays for the sampled pixels, flattened in row-major order
+        u = np.arange(0, width, stride)
+        v = np.arange(0, height, stride)
+        self.grid_shape = (len(v), len(u))
+        self._ray_x = np.tile(((u - cx) / fx).astype(np.float32), len(v))
+        self._ray_y = np.repeat(((v - cy) / fy).astype(np.float32), len(u))
+
+        # Depth and validity for every 8-bit value, so the mask costs one lookup
+        self.depth_scale, self.min_depth, self.max_depth = depth_scale, min_depth, max_depth
+        self._depth_lut = np.arange(256, dtype=np.float32) / 255.0 * depth_scale
+        self._valid_lut = (self._depth_lut > min_depth) & (self._depth_lut < max_depth)
+
+        size = self.grid_shape[0] * self.grid_shape[1]
+        self._points = np.empty((size, 3), dtype=np.float32)
+        self._colors = np.empty((size, 3), dtype=np.uint8)
+
+    def _depth(self, depth):
+        if depth.dtype == np.uint8:
+            return self._valid_lut[depth], depth
+        z = depth.astype(np.float32) / 255.0 * self.depth_scale
+        return (z > self.min_depth) & (z < self.max_depth), z
+
+    def project(self, depth_map, rgb_image=None):
+        """Points (N, 3) and colors (N, 3), or None, for the valid pixels"""
+        depth = depth_map[::self.stride, ::self.stride]
+        if depth.shape != self.grid_shape:
+            raise ValueError(f"Expected a {self.width}x{self.height} depth map, got "
+                             f"{depth_map.shape[1]}x{depth_map.shape[0]}")
+
+        valid, values = self._depth(depth)
+        index = np.flatnonzero(valid)
+        count = len(index)
+
+        points = self._points[:count]
+        z = values.ravel()[index]
+        if z.dtype == np.uint8:
+            z = self._depth_lut[z]
+        points[:, 2] = z
+        np.multiply(self._ray_x[index], z, out=points[:, 0])
+        np.multiply(self._ray_y[index], z, out=points[:, 1])
+
+        if rgb_image is None:
+            return points, None
+        colors = self._colors[:count]
+        np.take(rgb_image[::self.stride, ::self.stride].reshape(-1, 3), index, axis=0, out=colors, mode='clip')
+        return points, colors
+
+
+@lru_cache(maxsize=8)
+def get_projector(width, height, intrinsics=None, stride=1, depth_scale=10.0, min_depth=0.1, max_depth=8.0):
+    """Shared projector for one resolution, intrinsics tuple and stride"""
+    return PointCloudProjector(width, height, intrinsics, stride, depth_scale, min_depth, max_depth)
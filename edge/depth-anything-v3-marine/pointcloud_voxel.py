@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+"""
+Voxel-grid downsampling and multi-frame point cloud fusion
+Points are quantized to voxel keys, hashed to one integer each and reduced
+with bincount, keeping the centroid and mean color of every occupied voxel
+"""
+
+import numpy as np
+
+
+def _hash_keys(keys):
+    """Unique voxel keys of an (N, 3) int64 array and each row's index into them"""
+    low = keys.min(axis=0)
+    extent = keys.max(axis=0) - low + 1
+    if np.prod(extent.astype(np.float64)) >= 2 ** 63:
+        # Too sparse to pack into one int64; fall back to row-wise uniques
+        return np.unique(keys, axis=0, return_inverse=True)
+
+    flat = np.ravel_multi_index(tuple((keys - low).T), tuple(extent))
+    unique, inverse = np.unique(flat, return_inverse=True)
+    return np.stack(np.unravel_index(unique, tuple(extent)), axis=1) + low, inverse
+
+
+class VoxelGrid:
+    """Running per-voxel point and color sums
+
+    Frames added with add() are merged voxel by voxel, so the grid holds at
+    most one point per occupied voxel. When max_points is set and the grid
+    grows past it, the voxel size doubles until it fits again.
+    """
+
+    def __init__(self, voxel_size, max_points=None):
+        self.voxel_size = float(voxel_size)
+        self.max_points = max_points
+        self.has_colors = None
+        self._keys = np.empty((0, 3), dtype=np.int64)
+        self._sums = np.empty((0, 3), dtype=np.float64)
+        self._color_sums = np.empty((0, 3), dtype=np.float64)
+        self._counts = np.empty(0, dtype=np.float64)
+
+    def __len__(self):
+        return len(self._keys)
+
+    def add(self, points, colors=None, pose=None):
+        """Merge (N, 3) points, optional colors and an optional 4x4 camera-to-world pose"""
+        if self.has_colors is None:
+            self.has_colors = colors is not None
+        elif self.has_colors != (colors is not None):
+            raise ValueError("Frames must all have colors or all be without")
+        if len(points) == 0:
+            return self
+
+        points = np.asarray(points, dtype=np.float64)
+        if pose is not None:
+            pose = np.asarray(pose, dtype=np.float64)
+            points = points @ pose[:3, :3].T + pose[:3, 3]
+
+        keys = np.floor(points / self.voxel_size).astype(np.int64)
+        color_sums = np.asarray(colors, dtype=np.float64) if self.has_colors else self._color_sums[:0]
+        return self._merge(keys, points, color_sums, np.ones(len(points)))
+
+    def merge(self, other):
+        """Merge another grid whose voxel size divides this one by a power of two"""
+        factor = self.voxel_size / other.voxel_size
+        if factor < 1 or not float(factor).is_integer() or int(factor) & (int(factor) - 1):
+            raise ValueError(f"Cannot merge {other.voxel_size}m voxels into {self.voxel_size}m voxels")
+        if self.has_colors is None:
+            self.has_colors = other.has_colors
+        elif other.has_colors is not None and self.has_colors != other.has_colors:
+            raise ValueError("Frames must all have colors or all be without")
+        if len(other) == 0:
+            return self
+        return self._merge(other._keys // int(factor), other._sums, other._color_sums, other._counts)
+
+    def _merge(self, keys, sums, color_sums, counts):
+        self._reduce(np.concatenate([self._keys, keys]),
+                     np.concatenate([self._sums, sums]),
+                     np.concatenate([self._color_sums, color_sums]),
+                     np.concatenate([self._counts, counts]))
+
+        while self.max_points and len(self) > self.max_points:
+            self.voxel_size *= 2
+            self._reduce(self._keys // 2, self._sums, self._color_sums, self._counts)
+        return self
+
+    def _reduce(self, keys, sums, color_sums, counts):
+        self._keys, inverse = _hash_keys(keys)
+        size = len(self._keys)
+        inverse = inverse.ravel()
+
+        def total(values):
+            return np.stack([np.bincount(inverse, weights=values[:, i], minlength=size) for i in range(3)], axis=1)
+
+        self._sums = total(sums)
+        self._color_sums = total(color_sums) if self.has_colors else self._color_sums[:0]
+        self._counts = np.bincount(inverse, weights=counts, minlength=size)
+
+    def to_arrays(self):
+        """(M, 3) float32 voxel centroids and (M, 3) uint8 mean colors, or None"""
+        points = (self._sums / self._counts[:, None]).astype(np.float32)
+        if not self.has_colors:
+            return points, None
+        colors = np.rint(self._color_sums / self._counts[:, None]).astype(np.uint8)
+        return points, colors
+
+
+def voxel_downsample(points, colors=None, voxel_size=0.02):
+    """One point per occupied voxel: the centroid and mean color of its points"""
+    return VoxelGrid(voxel_size).add(points, colors).to_arrays()
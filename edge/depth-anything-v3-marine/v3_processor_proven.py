@@ -18,6 +18,14 @@ import cv2
 # Add DA3 to path (confirmed working approach)
 sys.path.insert(0, '/workspace/Depth-Anything-3/src')
 
+# Shared decode backends live in edge/scripts; the standalone container
+# image only ships this file, so plain OpenCV decode is kept as a fallback
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+try:
+    from frame_source import open_frame_source
+except ImportError:
+    open_frame_source = None
+
 print('=== PROVEN WORKING DEPTH ANYTHING V3 PROCESSOR ===')
 print(f'Timestamp: {datetime.now()}')
 
@@ -144,7 +152,7 @@ class DepthAnythingV3Processor:
             print(f'Image processing failed: {e}')
             raise
     
-    def process_video_frames(self, video_path, output_dir, max_frames=100, skip_frames=10):
+    def process_video_frames(self, video_path, output_dir, max_frames=100, skip_frames=10, decode_backend='opencv'):
         '''Process video frames with real DA3'''
         print(f'Processing video: {video_path}')
         
@@ -156,9 +164,15 @@ class DepthAnythingV3Processor:
         os.makedirs(depth_dir, exist_ok=True)
         
         # Extract frames
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
-            raise ValueError(f'Cannot open video: {video_path}')
+        if open_frame_source is not None:
+            try:
+                cap = open_frame_source(video_path, {'backend': decode_backend})
+            except RuntimeError:
+                raise ValueError(f'Cannot open video: {video_path}')
+        else:
+            cap = cv2.VideoCapture(video_path)
+            if not cap.isOpened():
+                raise ValueError(f'Cannot open video: {video_path}')
         
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
@@ -252,20 +266,21 @@ def main():
     print('Starting proven DA3 video processing...')
     
     if len(sys.argv) < 3:
-        print('Usage: python3 v3_processor_proven.py VIDEO_PATH OUTPUT_DIR [MODEL_SIZE]')
+        print('Usage: python3 v3_processor_proven.py VIDEO_PATH OUTPUT_DIR [MODEL_SIZE] [DECODE_BACKEND]')
         print('Example: python3 v3_processor_proven.py video.mp4 output/ base')
         return
     
     video_path = sys.argv[1]
     output_dir = sys.argv[2]
     model_size = sys.argv[3] if len(sys.argv) > 3 else 'base'
+    decode_backend = sys.argv[4] if len(sys.argv) > 4 else 'opencv'
     
     try:
         # Initialize processor
         processor = DepthAnythingV3Processor(model_size)
         
         # Process video
-        summary = processor.process_video_frames(video_path, output_dir)
+        summary = processor.process_video_frames(video_path, output_dir, decode_backend=decode_backend)
         
         print(f'\n🎉 SUCCESS: Real DA3 processing complete!')
         print(f'Model: DepthAnything3-{model_size}')
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BatchInferFn = Callable[[List[np.ndarray], str], List[Dict[str, Any]]]
+
+
+class MicroBatcher:
+    """Collect concurrent inference requests into micro-batches.
+
+    Requests queue up on the event loop; a dispatcher takes up to
+    ``max_batch_size`` of them, waiting at most ``max_wait`` seconds after
+    the first, and runs the blocking ``infer_batch`` in a thread pool. While
+    every worker thread is busy new requests keep accumulating, so batches
+    grow with load. Each caller gets back only its own result.
+    """
+
+    def __init__(self, infer_batch: BatchInferFn, max_batch_size: int = 8,
+                 max_wait: float = 0.01, workers: int = 2):
+        self.infer_batch = infer_batch
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.workers = max(1, workers)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='inference')
+        self._queue: Optional[asyncio.Queue] = None
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        """Start the dispatcher on the running event loop."""
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.workers)
+        self._dispatcher = asyncio.get_running_loop().create_task(self._dispatch())
+
+    async def stop(self) -> None:
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            try:
+                await self._dispatcher
+            except asyncio.CancelledError:
+                pass
+        self.executor.shutdown(wait=False)
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    async def submit(self, image: np.ndarray, model_id: str) -> Dict[str, Any]:
+        """Queue one image and wait for its result."""
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((image, model_id, future))
+        return await future
+
+    async def _collect(self) -> List[Tuple[np.ndarray, str, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - asyncio.get_running_loop().time()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _dispatch(self) -> None:
+        while True:
+            # Wait for a free worker before collecting, so requests that
+            # arrive meanwhile join the next batch instead of queueing as
+            # single-image calls.
+            await self._slots.acquire()
+            batch = await self._collect()
+            by_model: Dict[str, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+            for image, model_id, future in batch:
+                by_model.setdefault(model_id, []).append((image, future))
+            tasks = [
+                asyncio.create_task(self._run(model_id, items))
+                for model_id, items in by_model.items()
+            ]
+            asyncio.get_running_loop().create_task(self._release_when_done(tasks))
+
+    async def _release_when_done(self, tasks: List[asyncio.Task]) -> None:
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self._slots.release()
+
+    async def _run(self, model_id: str, items: List[Tuple[np.ndarray, asyncio.Future]]) -> None:
+        images = [image for image, _ in items]
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.executor, self.infer_batch, images, model_id)
+            if len(results) != len(items):
+                raise RuntimeError(f"Expected {len(items)} results, got {len(results)}")
+        except Exception as e:
+            logger.error(f"Batch inference failed for {len(items)} images: {str(e)}")
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(items, results):
+            if not future.done():
+                future.set_result(result)
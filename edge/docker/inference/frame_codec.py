@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+
+"""
+Binary request bodies for ``/predict``.
+
+Two formats skip multipart encoding, and the first also skips the image codec:
+
+* A single raw frame: ``application/octet-stream`` with the uint8 pixels as
+  the body and an ``X-Frame-Shape: height,width[,channels]`` header.
+* Several frames in one request: ``application/x-edge-frames``, a small
+  little-endian container::
+
+      magic 'EDGF' | version u8 | count u32
+      per frame: kind u8 | height u32 | width u32 | channels u32 | length u32 | data
+
+  ``kind`` 0 carries raw uint8 HWC pixels, kind 1 an encoded image
+  (JPEG/PNG) whose shape fields are ignored.
+
+Raw frames are mapped straight onto the request body without copying.
+
+``BatchUploadClient`` instead keeps JPEG encoding but sends a whole batch as
+one multipart upload to ``/predict_batch``.
+"""
+
+import struct
+import threading
+from typing import Any, Callable, Dict, List, Optional, Union
+
+import cv2
+import numpy as np
+import requests
+
+RAW_CONTENT_TYPE = 'application/octet-stream'
+FRAMES_CONTENT_TYPE = 'application/x-edge-frames'
+SHAPE_HEADER = 'X-Frame-Shape'
+
+MAGIC = b'EDGF'
+VERSION = 1
+KIND_RAW = 0
+KIND_ENCODED = 1
+
+_HEADER = struct.Struct('<4sBI')
+_FRAME = struct.Struct('<BIIII')
+
+
+def parse_shape(value: Optional[str]) -> tuple:
+    """Parse an ``X-Frame-Shape`` header value into an array shape."""
+    if not value:
+        raise ValueError(f"Raw frames need an {SHAPE_HEADER} header")
+    shape = tuple(int(part) for part in value.split(','))
+    if len(shape) not in (2, 3) or min(shape) <= 0:
+        raise ValueError(f"Invalid frame shape: {value}")
+    return shape
+
+
+def raw_frame(body: bytes, shape: tuple) -> np.ndarray:
+    """View a raw uint8 body as a frame of the given shape."""
+    expected = int(np.prod(shape))
+    if len(body) != expected:
+        raise ValueError(f"Frame of shape {shape} needs {expected} bytes, got {len(body)}")
+    return np.frombuffer(body, dtype=np.uint8).reshape(shape)
+
+
+def pack_frames(frames: List[Union[np.ndarray, bytes]]) -> bytes:
+    """Pack raw frames (arrays) and encoded images (bytes) into one body."""
+    parts = [_HEADER.pack(MAGIC, VERSION, len(frames))]
+    for frame in frames:
+        if isinstance(frame, np.ndarray):
+            if frame.dtype != np.uint8:
+                raise ValueError(f"Raw frames must be uint8, got {frame.dtype}")
+            height, width = frame.shape[:2]
+            channels = frame.shape[2] if frame.ndim == 3 else 1
+            data = np.ascontiguousarray(frame).data
+            parts.append(_FRAME.pack(KIND_RAW, height, width, channels, frame.nbytes))
+        else:
+            data = frame
+            parts.append(_FRAME.pack(KIND_ENCODED, 0, 0, 0, len(frame)))
+        parts.append(data)
+    return b''.join(parts)
+
+
+def unpack_frames(body: bytes, decode_image: Callable[[bytes], np.ndarray]) -> List[np.ndarray]:
+    """Split a multi-frame body; encoded entries go through ``decode_image``."""
+    if len(body) < _HEADER.size:
+        raise ValueError("Truncated frame payload")
+    magic, version, count = _HEADER.unpack_from(body)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("Not an edge frame payload")
+
+    frames = []
+    offset = _HEADER.size
+    for _ in range(count):
+        if offset + _FRAME.size > len(body):
+            raise ValueError("Truncated frame payload")
+        kind, height, width, channels, length = _FRAME.unpack_from(body, offset)
+        offset += _FRAME.size
+        if offset + length > len(body):
+            raise ValueError("Truncated frame payload")
+        if kind == KIND_RAW:
+            if length != height * width * channels:
+                raise ValueError(f"Frame of {height}x{width}x{channels} needs "
+                                 f"{height * width * channels} bytes, got {length}")
+            shape = (height, width, channels) if channels > 1 else (height, width)
+            frames.append(np.frombuffer(body, dtype=np.uint8, count=length, offset=offset).reshape(shape))
+        elif kind == KIND_ENCODED:
+            frames.append(decode_image(body[offset:offset + length]))
+        else:
+            raise ValueError(f"Unknown frame kind: {kind}")
+        offset += length
+    return frames
+
+
+class RawFrameClient:
+    """Drop-in for ``InferenceHTTPClient.infer`` that posts raw frames.
+
+    Frames travel as uint8 pixels in one ``application/x-edge-frames``
+    request per call, so neither side spends time on JPEG encode/decode.
+    Suited to a fast LAN between camera nodes and the inference server.
+    """
+
+    def __init__(self, api_url: str):
+        self.api_url = api_url.rstrip('/')
+        self._local = threading.local()
+
+    @property
+    def session(self) -> requests.Session:
+        # One session per pipeline worker thread
+        if not hasattr(self._local, 'session'):
+            self._local.session = requests.Session()
+        return self._local.session
+
+    def infer(self, inference_input: Union[np.ndarray, List[np.ndarray]],
+              model_id: str) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run inference on one frame or a list of frames."""
+        frames = inference_input if isinstance(inference_input, list) else [inference_input]
+        response = self.session.post(
+            f"{self.api_url}/predict",
+            params={'model_id': model_id},
+            data=pack_frames(frames),
+            headers={'Content-Type': FRAMES_CONTENT_TYPE}
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        if 'error' in body:
+            raise RuntimeError(f"Inference server error: {body['error']}")
+        results = body['results']
+        return results if isinstance(inference_input, list) else results[0]
+
+
+class BatchUploadClient(RawFrameClient):
+    """Drop-in for ``InferenceHTTPClient.infer`` that uploads a batch at once.
+
+    Frames are JPEG-encoded like the Roboflow client does, but a list of
+    frames goes to ``/predict_batch`` as one multipart request instead of
+    one request per image.
+    """
+
+    def __init__(self, api_url: str, jpeg_quality: int = 95):
+        super().__init__(api_url)
+        self.jpeg_quality = jpeg_quality
+
+    def _encode(self, frame: np.ndarray) -> bytes:
+        ok, encoded = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        if not ok:
+            raise ValueError(f"Could not JPEG-encode frame of shape {frame.shape}")
+        return encoded.tobytes()
+
+    def infer(self, inference_input: Union[np.ndarray, List[np.ndarray]],
+              model_id: str) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run inference on one frame or a list of frames."""
+        frames = inference_input if isinstance(inference_input, list) else [inference_input]
+        files = [('files', (f'frame_{i}.jpg', self._encode(frame), 'image/jpeg'))
+                 for i, frame in enumerate(frames)]
+        response = self.session.post(
+            f"{self.api_url}/predict_batch",
+            params={'model_id': model_id},
+            files=files
+        )
+        response.raise_for_status()
+        body = response.json()
+
+        if 'error' in body:
+            raise RuntimeError(f"Inference server error: {body['error']}")
+        results = body['results']
+        return results if isinstance(inference_input, list) else results[0]
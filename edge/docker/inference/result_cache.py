@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+def exact_hash(image: np.ndarray) -> str:
+    """Digest of the decoded pixels and their shape."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(image.shape).encode())
+    digest.update(np.ascontiguousarray(image).data)
+    return digest.hexdigest()
+
+
+def perceptual_hash(image: np.ndarray, hash_size: int = 8) -> str:
+    """64-bit difference hash; near-identical frames share a value."""
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    small = cv2.resize(gray, (hash_size + 1, hash_size), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return f"{int(np.packbits(bits).view('>u8')[0]):016x}"
+
+
+class ResultCache:
+    """Thread-safe LRU cache of inference results with a TTL.
+
+    Keys are ``(model_id, image hash)``; ``mode`` picks an exact pixel hash
+    or a perceptual hash that also matches visually identical frames.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 3600.0, mode: str = 'exact'):
+        if mode not in ('exact', 'perceptual'):
+            raise ValueError(f"Unknown cache hash mode: {mode}")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.mode = mode
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def key(self, model_id: str, image: np.ndarray) -> Tuple[str, str]:
+        image_hash = perceptual_hash(image) if self.mode == 'perceptual' else exact_hash(image)
+        return model_id, image_hash
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self.evictions += 1
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'mode': self.mode,
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl_seconds': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -1,38 +1,244 @@
 import os
+import asyncio
+import time
 import cv2
 import numpy as np
-from fastapi import FastAPI, File, UploadFile
-from inference_sdk import InferenceHTTPClient
+from fastapi import FastAPI, File, Request, UploadFile
+from fastapi.responses import PlainTextResponse
+from inference_sdk import InferenceConfiguration, InferenceHTTPClient
 import uvicorn
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel
+
+from batching import MicroBatcher
+from frame_codec import FRAMES_CONTENT_TYPE, SHAPE_HEADER, parse_shape, raw_frame, unpack_frames
+from metrics import BATCH_BUCKETS, Counter, Gauge, Histogram, Registry, bounded_label
+from result_cache import ResultCache
+from shm_transport import SharedFrameReader
 
 app = FastAPI(title="Video Processing Inference Server")
 
+MODEL_ID = os.environ.get("MODEL_ID", "fish-scuba-project/2")
+MAX_BATCH_SIZE = int(os.environ.get("MAX_BATCH_SIZE", 8))
+MAX_BATCH_WAIT_MS = float(os.environ.get("MAX_BATCH_WAIT_MS", 10))
+INFERENCE_WORKERS = int(os.environ.get("INFERENCE_WORKERS", 2))
+RESULT_CACHE_SIZE = int(os.environ.get("RESULT_CACHE_SIZE", 1024))
+RESULT_CACHE_TTL_S = float(os.environ.get("RESULT_CACHE_TTL_S", 3600))
+RESULT_CACHE_HASH = os.environ.get("RESULT_CACHE_HASH", "exact")
+
 # Initialize the Roboflow client
 client = InferenceHTTPClient(
     api_key=os.environ.get("ROBOFLOW_API_KEY"),
 )
+client.configure(InferenceConfiguration(max_batch_size=MAX_BATCH_SIZE))
+
+# Metrics served at /metrics
+registry = Registry()
+REQUESTS = registry.register(Counter(
+    "inference_requests_total", "Prediction requests received", ["endpoint"]))
+ERRORS = registry.register(Counter(
+    "inference_request_errors_total", "Prediction requests that failed", ["endpoint"]))
+IN_FLIGHT = registry.register(Gauge(
+    "inference_requests_in_flight", "Prediction requests currently being handled"))
+REQUEST_SECONDS = registry.register(Histogram(
+    "inference_request_seconds", "End-to-end prediction request latency", ["endpoint"]))
+DECODE_SECONDS = registry.register(Histogram(
+    "inference_decode_seconds", "Image decode time per image"))
+MODEL_SECONDS = registry.register(Histogram(
+    "inference_model_seconds", "Model call time per micro-batch"))
+BATCH_SIZE = registry.register(Histogram(
+    "inference_batch_size", "Images per micro-batch", buckets=BATCH_BUCKETS))
+
+def infer_batch(images: List[np.ndarray], model_id: str) -> List[Dict[str, Any]]:
+    """Blocking model call for one micro-batch; runs in the batcher's threads."""
+    start = time.perf_counter()
+    try:
+        return client.infer(images, model_id=model_id)
+    finally:
+        MODEL_SECONDS.observe(time.perf_counter() - start)
+        BATCH_SIZE.observe(len(images))
+
+# Concurrent requests are merged into micro-batches off the event loop
+batcher = MicroBatcher(
+    infer_batch,
+    max_batch_size=MAX_BATCH_SIZE,
+    max_wait=MAX_BATCH_WAIT_MS / 1000.0,
+    workers=INFERENCE_WORKERS
+)
+
+# Repeated frames and re-runs of a clip are answered from memory
+result_cache = ResultCache(
+    max_entries=RESULT_CACHE_SIZE,
+    ttl=RESULT_CACHE_TTL_S,
+    mode=RESULT_CACHE_HASH
+)
+
+registry.register(Gauge(
+    "inference_queue_depth", "Images waiting for a micro-batch",
+    callback=lambda: batcher.queue_depth))
+registry.register(Counter(
+    "inference_cache_hits_total", "Result cache hits", callback=lambda: result_cache.hits))
+registry.register(Counter(
+    "inference_cache_misses_total", "Result cache misses", callback=lambda: result_cache.misses))
+
+# Frames handed over through /dev/shm by co-located clients
+shared_frames = SharedFrameReader()
+
+class SharedFrameRequest(BaseModel):
+    model_id: Optional[str] = None
+    frames: List[Dict[str, Any]]
+
+@app.on_event("startup")
+async def start_batcher() -> None:
+    batcher.start()
+
+@app.on_event("shutdown")
+async def stop_batcher() -> None:
+    await batcher.stop()
+
+# Known inference routes; any other /predict* path is counted as "other"
+PREDICT_ENDPOINTS = ("/predict", "/predict_batch", "/predict_shm")
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    if not request.url.path.startswith("/predict"):
+        return await call_next(request)
+    endpoint = bounded_label(request.url.path, PREDICT_ENDPOINTS)
+    REQUESTS.inc(endpoint)
+    IN_FLIGHT.inc()
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+        if response.status_code >= 400:
+            ERRORS.inc(endpoint)
+        return response
+    except Exception:
+        ERRORS.inc(endpoint)
+        raise
+    finally:
+        IN_FLIGHT.dec()
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint)
+
+def decode_image(contents: bytes) -> np.ndarray:
+    start = time.perf_counter()
+    nparr = np.frombuffer(contents, np.uint8)
+    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    DECODE_SECONDS.observe(time.perf_counter() - start)
+    return image
+
+async def decode_uploads(files: List[UploadFile]) -> List[np.ndarray]:
+    """Read and decode uploaded images without blocking the event loop."""
+    loop = asyncio.get_running_loop()
+    contents = [await file.read() for file in files]
+    return await asyncio.gather(*(loop.run_in_executor(None, decode_image, c) for c in contents))
+
+async def infer(image: np.ndarray, model_id: str) -> Dict[str, Any]:
+    """Answer from the result cache, or queue the image for batched inference."""
+    if not result_cache.enabled:
+        return await batcher.submit(image, model_id)
+    key = await asyncio.get_running_loop().run_in_executor(None, result_cache.key, model_id, image)
+    result = result_cache.get(key)
+    if result is None:
+        result = await batcher.submit(image, model_id)
+        result_cache.put(key, result)
+    return result
 
 @app.post("/predict")
-async def predict(file: UploadFile = File(...)) -> Dict[str, Any]:
+async def predict(request: Request, file: Optional[UploadFile] = File(None),
+                  model_id: Optional[str] = None) -> Dict[str, Any]:
     """
     Process an image and return predictions.
+
+    Besides a multipart image upload, accepts a raw uint8 frame
+    (``application/octet-stream`` with an ``X-Frame-Shape`` header) or
+    several frames in one ``application/x-edge-frames`` body, which
+    returns ``{"results": [...]}``. See ``frame_codec`` for the layout.
     """
+    if file is None:
+        return await predict_binary(request, model_id or MODEL_ID)
+
     # Read and decode image
-    contents = await file.read()
-    nparr = np.frombuffer(contents, np.uint8)
-    image = cv2.imdecode(nparr, cv2.IMREAD_COLOR)
+    image, = await decode_uploads([file])
 
     # Get predictions from model
     try:
-        result = client.infer(
-            image,
-            model_id=os.environ.get("MODEL_ID", "fish-scuba-project/2")
-        )
-        return result
+        return await infer(image, model_id or MODEL_ID)
     except Exception as e:
+        ERRORS.inc("/predict")
         return {"error": str(e)}
 
+async def predict_binary(request: Request, model_id: str) -> Dict[str, Any]:
+    """Handle the raw-frame and multi-frame bodies of ``/predict``."""
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(FRAMES_CONTENT_TYPE):
+            loop = asyncio.get_running_loop()
+            images = await loop.run_in_executor(None, unpack_frames, body, decode_image)
+            results = await asyncio.gather(*(infer(image, model_id) for image in images))
+            return {"results": list(results)}
+        image = raw_frame(body, parse_shape(request.headers.get(SHAPE_HEADER)))
+        return await infer(image, model_id)
+    except Exception as e:
+        ERRORS.inc("/predict")
+        return {"error": str(e)}
+
+@app.post("/predict_batch")
+async def predict_batch(files: List[UploadFile] = File(...),
+                        model_id: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Process several images in one request and return predictions per image.
+    """
+    images = await decode_uploads(files)
+
+    try:
+        results = await asyncio.gather(*(infer(image, model_id or MODEL_ID) for image in images))
+        return {"results": list(results)}
+    except Exception as e:
+        ERRORS.inc("/predict_batch")
+        return {"error": str(e)}
+
+@app.post("/predict_shm")
+async def predict_shm(request: SharedFrameRequest) -> Dict[str, Any]:
+    """
+    Process frames written to shared memory by a client on the same host.
+    """
+    try:
+        images = shared_frames.frames(request.frames)
+        model_id = request.model_id or MODEL_ID
+        results = await asyncio.gather(*(infer(image, model_id) for image in images))
+        return {"results": list(results)}
+    except Exception as e:
+        ERRORS.inc("/predict_shm")
+        return {"error": str(e)}
+
+@app.get("/stats")
+async def stats() -> Dict[str, Any]:
+    """
+    Report result cache and batching counters and latency percentiles.
+    """
+    def quantiles(histogram: Histogram, *labels: str) -> Dict[str, Optional[float]]:
+        return {f"p{int(q * 100)}": histogram.quantile(q, *labels) for q in (0.5, 0.95, 0.99)}
+
+    return {
+        "cache": result_cache.stats(),
+        "batcher": {"queue_depth": batcher.queue_depth},
+        "latency_seconds": {
+            "decode": quantiles(DECODE_SECONDS),
+            "model": quantiles(MODEL_SECONDS),
+            **{
+                endpoint: quantiles(REQUEST_SECONDS, endpoint)
+                for endpoint in ("/predict", "/predict_batch", "/predict_shm")
+            }
+        }
+    }
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> str:
+    """
+    Export counters and latency histograms in Prometheus text format.
+    """
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health_check() -> Dict[str, str]:
     """
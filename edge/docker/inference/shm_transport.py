@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+
+"""
+Shared-memory frame transport between VideoProcessor and the inference server.
+
+Raw frames are written into a ring of fixed-size slots in POSIX shared
+memory (``/dev/shm`` on Linux). Only a small JSON descriptor per frame goes
+over HTTP, and the server maps the slot as a NumPy array without any codec.
+Both processes must share ``/dev/shm`` (same host, ``ipc: host`` or a
+shared ``/dev/shm`` mount when running in containers).
+"""
+
+import atexit
+import logging
+import queue
+import threading
+import uuid
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from typing import Any, Dict, List, Union
+
+import numpy as np
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class FrameRing:
+    """Ring of fixed-size frame slots in a shared memory segment."""
+
+    def __init__(self, slots: int, slot_bytes: int):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.shm = shared_memory.SharedMemory(
+            name=f"edge-frames-{uuid.uuid4().hex[:12]}",
+            create=True,
+            size=slots * slot_bytes
+        )
+        self._free = queue.Queue()
+        self._acquire_lock = threading.Lock()
+        # Requests currently using the ring; guarded by the owning client
+        self.users = 0
+        self.retired = False
+        for slot in range(slots):
+            self._free.put(slot)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def acquire(self, count: int = 1) -> List[int]:
+        """Block until ``count`` slots are free and return their indices."""
+        # Taking a batch's slots under one lock keeps concurrent callers from
+        # each holding part of the ring and waiting on the other.
+        with self._acquire_lock:
+            return [self._free.get() for _ in range(count)]
+
+    def release(self, slot: int) -> None:
+        self._free.put(slot)
+
+    def write(self, slot: int, frame: np.ndarray) -> Dict[str, Any]:
+        """Copy a frame into a slot and return its descriptor."""
+        frame = np.ascontiguousarray(frame)
+        if frame.nbytes > self.slot_bytes:
+            raise ValueError(f"Frame of {frame.nbytes} bytes exceeds slot size {self.slot_bytes}")
+        offset = slot * self.slot_bytes
+        view = np.ndarray(frame.shape, dtype=frame.dtype, buffer=self.shm.buf, offset=offset)
+        view[...] = frame
+        return {
+            'name': self.name,
+            'offset': offset,
+            'shape': list(frame.shape),
+            'dtype': frame.dtype.str
+        }
+
+    def close(self) -> None:
+        self.shm.close()
+        self.shm.unlink()
+
+
+class ShmInferenceClient:
+    """Drop-in for ``InferenceHTTPClient.infer`` over the shared-memory transport.
+
+    The ring is sized from the first frame seen and reallocated if a larger
+    frame arrives; a replaced ring is unlinked once the last request using it
+    finishes. Each slot stays reserved until the server has answered, so at
+    most ``slots`` frames are in flight at once, and a batch larger than the
+    ring is sent as several requests.
+    """
+
+    def __init__(self, api_url: str, slots: int = 8):
+        self.api_url = api_url.rstrip('/')
+        self.slots = slots
+        self.session = requests.Session()
+        self._ring = None
+        self._lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _checkout_ring(self, nbytes: int) -> FrameRing:
+        with self._lock:
+            if self._ring is None or nbytes > self._ring.slot_bytes:
+                if self._ring is not None:
+                    self._retire(self._ring)
+                self._ring = FrameRing(self.slots, nbytes)
+                logger.info(f"Allocated shared memory ring {self._ring.name}: "
+                            f"{self.slots} x {nbytes / 1024**2:.1f} MB")
+            self._ring.users += 1
+            return self._ring
+
+    def _checkin_ring(self, ring: FrameRing) -> None:
+        with self._lock:
+            ring.users -= 1
+            if ring.retired and ring.users == 0:
+                ring.close()
+
+    def _retire(self, ring: FrameRing) -> None:
+        # Requests may still be waiting on its slots; the last one closes it
+        ring.retired = True
+        if ring.users == 0:
+            ring.close()
+
+    def _infer_frames(self, frames: List[np.ndarray], model_id: str) -> List[Dict[str, Any]]:
+        ring = self._checkout_ring(max(frame.nbytes for frame in frames))
+        try:
+            held = ring.acquire(len(frames))
+            try:
+                descriptors = [ring.write(slot, frame) for slot, frame in zip(held, frames)]
+                response = self.session.post(
+                    f"{self.api_url}/predict_shm",
+                    json={'model_id': model_id, 'frames': descriptors}
+                )
+                response.raise_for_status()
+                body = response.json()
+            finally:
+                for slot in held:
+                    ring.release(slot)
+        finally:
+            self._checkin_ring(ring)
+
+        if 'error' in body:
+            raise RuntimeError(f"Inference server error: {body['error']}")
+        return body['results']
+
+    def infer(self, inference_input: Union[np.ndarray, List[np.ndarray]],
+              model_id: str) -> Union[Dict[str, Any], List[Dict[str, Any]]]:
+        """Run inference on one frame or a list of frames."""
+        frames = inference_input if isinstance(inference_input, list) else [inference_input]
+        results = []
+        for start in range(0, len(frames), self.slots):
+            results.extend(self._infer_frames(frames[start:start + self.slots], model_id))
+        return results if isinstance(inference_input, list) else results[0]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._ring is not None:
+                self._retire(self._ring)
+                self._ring = None
+
+
+class SharedFrameReader:
+    """Server-side view of client frame rings, attached lazily by name."""
+
+    def __init__(self, max_segments: int = 4):
+        self.max_segments = max_segments
+        self._segments: "OrderedDict[str, shared_memory.SharedMemory]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _attach(self, name: str) -> shared_memory.SharedMemory:
+        with self._lock:
+            if name in self._segments:
+                self._segments.move_to_end(name)
+                return self._segments[name]
+            shm = shared_memory.SharedMemory(name=name, create=False)
+            # The client owns the segment; stop this process's resource
+            # tracker from unlinking it when the server exits.
+            resource_tracker.unregister(shm._name, 'shared_memory')
+            self._segments[name] = shm
+            while len(self._segments) > self.max_segments:
+                _, stale = self._segments.popitem(last=False)
+                try:
+                    stale.close()
+                except BufferError:
+                    # A request still holds a view; the mapping goes with it
+                    pass
+            return shm
+
+    def frame(self, descriptor: Dict[str, Any]) -> np.ndarray:
+        """Map a frame descriptor to an array backed by shared memory."""
+        shm = self._attach(descriptor['name'])
+        return np.ndarray(
+            tuple(descriptor['shape']),
+            dtype=np.dtype(descriptor['dtype']),
+            buffer=shm.buf,
+            offset=descriptor['offset']
+        )
+
+    def frames(self, descriptors: List[Dict[str, Any]]) -> List[np.ndarray]:
+        return [self.frame(descriptor) for descriptor in descriptors]
@@ -17,7 +17,9 @@ import argparse
 import cv2
 import logging
 import matplotlib.pyplot as plt
+import os
 import PIL.Image
+import sys
 import time
 from typing import Optional
 from nanoowl.tree import Tree
@@ -25,6 +27,9 @@ from nanoowl.tree_predictor import TreePredictor
 from nanoowl.tree_drawing import draw_tree_output
 from nanoowl.owl_predictor import OwlPredictor
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from frame_source import open_frame_source
+
 
 def get_colors(count: int):
     cmap = plt.cm.get_cmap("rainbow", count)
@@ -47,7 +52,8 @@ def process_video(
     image_encode_engine: str,
     prompt: str,
     output_fps: Optional[float] = None,
-    resize_resolution: Optional[str] = None
+    resize_resolution: Optional[str] = None,
+    decode_backend: str = "opencv"
 ):
     logging.info(f"Processing video: {video_path}")
     logging.info(f"Output path: {output_path}")
@@ -75,21 +81,20 @@ def process_video(
         logging.error(f"Error parsing prompt: {e}")
         return
 
-    # Open the video file
-    video = cv2.VideoCapture(video_path)
-    if not video.isOpened():
+    # Open the video file, scaling in the decoder if a resize is requested
+    decode_config = {"backend": decode_backend}
+    if resize_resolution:
+        decode_config["width"], decode_config["height"] = map(int, resize_resolution.split("x"))
+    try:
+        video = open_frame_source(video_path, decode_config)
+    except RuntimeError:
         logging.error(f"Could not open video file: {video_path}")
         return
 
     # Get video properties
-    width = int(video.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(video.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    width, height = video.frame_size
     fps = video.get(cv2.CAP_PROP_FPS)
     total_frames = int(video.get(cv2.CAP_PROP_FRAME_COUNT))
-    
-    # Apply resize if specified
-    if resize_resolution:
-        width, height = map(int, resize_resolution.split("x"))
 
     # Use provided output FPS or original video FPS
     if output_fps is None:
@@ -108,10 +113,6 @@ def process_video(
         if not ret:
             break
 
-        # Resize if needed
-        if resize_resolution:
-            frame = cv2.resize(frame, (width, height))
-
         # Convert to PIL image
         image_pil = cv2_to_pil(frame)
 
@@ -157,6 +158,9 @@ if __name__ == "__main__":
     parser.add_argument("--prompt", type=str, required=True, help="Detection prompt")
     parser.add_argument("--output_fps", type=float, help="Output video FPS (default: same as input)")
     parser.add_argument("--resize", type=str, help="Resize resolution as WIDTHxHEIGHT")
+    parser.add_argument("--decode_backend", type=str, default="opencv",
+                        choices=["opencv", "ffmpeg", "pyav", "gstreamer", "auto"],
+                        help="Video decode backend (auto uses the device default)")
     parser.add_argument("--log_level", type=str, default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"],
                         help="Logging level")
 
@@ -175,5 +179,6 @@ if __name__ == "__main__":
         image_encode_engine=args.image_encode_engine,
         prompt=args.prompt,
         output_fps=args.output_fps,
-        resize_resolution=args.resize
+        resize_resolution=args.resize,
+        decode_backend=args.decode_backend
     )
@@ -2,10 +2,280 @@
 
 import argparse
 import json
+import numpy as np
 import pandas as pd
 import logging
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from result_writer import JsonlResults, JsonResults
+
+BOX_FIELDS = ('confidence', 'x', 'y', 'width', 'height')
+PARQUET_COMPRESSION = ('zstd', 'snappy', 'gzip', 'none')
+CONFIDENCE_PERCENTILES = [0.25, 0.5, 0.75, 0.95]
+# Confidence histogram resolution for the summary percentiles
+CONFIDENCE_BINS = 1000
+# Frames per chunk when streaming exports
+CHUNK_FRAMES = 10000
+
+
+class DetectionColumns:
+    """Frame results as typed columns, one row per detection.
+
+    Frames without detections get a single row whose detection fields are
+    missing, as in the CSV export. Classes are stored as integer codes into
+    ``classes``, in order of first appearance. Missing codes, detection
+    indices and track ids are -1 and missing box values NaN.
+    """
+
+    def __init__(self, frame_results: Iterable[Dict[str, Any]]):
+        frame_numbers, timestamps, cpu, memory, counts, interpolated = [], [], [], [], [], []
+        class_codes: Dict[str, int] = {}
+        codes, boxes, track_ids = [], [], []
+        box_values = itemgetter(*BOX_FIELDS)
+        for frame in frame_results:
+            predictions = frame['predictions']
+            frame_numbers.append(frame['frame_number'])
+            timestamps.append(frame['timestamp'])
+            cpu.append(frame['system_stats']['cpu_percent'])
+            memory.append(frame['system_stats']['memory_percent'])
+            counts.append(len(predictions))
+            interpolated.append(frame.get('interpolated', False))
+            for pred in predictions:
+                codes.append(class_codes.setdefault(pred['class'], len(class_codes)))
+                boxes.append(box_values(pred))
+                track_id = pred.get('track_id')
+                track_ids.append(-1 if track_id is None else track_id)
+
+        counts = np.array(counts, dtype=np.int32)
+        rows = np.maximum(counts, 1)
+        self.has_detection = np.repeat(counts > 0, rows)
+        num_rows = int(rows.sum())
+
+        self.columns: Dict[str, np.ndarray] = {
+            'frame_number': np.repeat(np.array(frame_numbers, dtype=np.int32), rows),
+            'timestamp': np.repeat(np.array(timestamps, dtype=object), rows),
+            'cpu_percent': np.repeat(np.array(cpu, dtype=np.float32), rows),
+            'memory_percent': np.repeat(np.array(memory, dtype=np.float32), rows),
+            'detection_count': np.repeat(counts, rows),
+            'interpolated': np.repeat(np.array(interpolated, dtype=bool), rows)
+        }
+        first_row = np.repeat(np.cumsum(rows) - rows, rows)
+        detection_index = (np.arange(num_rows) - first_row).astype(np.int32)
+        detection_index[~self.has_detection] = -1
+        self.columns['detection_index'] = detection_index
+
+        self.classes = np.array(list(class_codes), dtype=object)
+        self.columns['class'] = self._detection_column(np.array(codes, dtype=np.int32), -1)
+        boxes = np.array(boxes, dtype=np.float32).reshape(-1, len(BOX_FIELDS))
+        for i, field in enumerate(BOX_FIELDS):
+            self.columns[field] = self._detection_column(boxes[:, i], np.nan)
+        self.columns['track_id'] = self._detection_column(np.array(track_ids, dtype=np.int32), -1)
+
+    @classmethod
+    def chunks(cls, frame_results: Iterable[Dict[str, Any]],
+               chunk_frames: int = CHUNK_FRAMES) -> Iterator['DetectionColumns']:
+        """Columns for successive chunks of ``chunk_frames`` frames.
+
+        At least one chunk is yielded, empty if there are no frames.
+        """
+        frames = iter(frame_results)
+        chunk = list(islice(frames, chunk_frames))
+        yield cls(chunk)
+        while True:
+            chunk = list(islice(frames, chunk_frames))
+            if not chunk:
+                return
+            yield cls(chunk)
+
+    def _detection_column(self, values: np.ndarray, missing: Any) -> np.ndarray:
+        column = np.full(len(self.has_detection), missing, dtype=values.dtype)
+        column[self.has_detection] = values
+        return column
+
+    def __len__(self) -> int:
+        return len(self.has_detection)
+
+    def to_pandas(self) -> pd.DataFrame:
+        """DataFrame with a categorical class column and nullable integer columns."""
+        data = dict(self.columns)
+        data['class'] = pd.Categorical.from_codes(data['class'], categories=self.classes)
+        for name in ('detection_index', 'track_id'):
+            data[name] = pd.arrays.IntegerArray(data[name], data[name] < 0)
+        return pd.DataFrame(data)
+
+    def to_arrow(self):
+        """Arrow table with the class column dictionary-encoded and missing values as nulls."""
+        import pyarrow as pa
+
+        arrays = {}
+        for name, values in self.columns.items():
+            if name == 'class':
+                arrays[name] = pa.DictionaryArray.from_arrays(
+                    pa.array(values, mask=values < 0),
+                    pa.array(self.classes.tolist(), type=pa.string())
+                )
+            elif name == 'timestamp':
+                arrays[name] = pa.array(values.tolist(), type=pa.string())
+            elif name in ('detection_index', 'track_id'):
+                arrays[name] = pa.array(values, mask=values < 0)
+            elif name in BOX_FIELDS:
+                arrays[name] = pa.array(values, mask=~self.has_detection)
+            else:
+                arrays[name] = pa.array(values)
+        return pa.table(arrays)
+
+
+class SummaryAccumulator:
+    """Summary statistics accumulated over chunks of detection columns.
+
+    Memory grows with the number of classes, tracks and seconds of video,
+    not with the number of detections: confidence percentiles come from a
+    per-class histogram of confidences rounded to ``1 / CONFIDENCE_BINS``. Rates and the per-second
+    series use video time, i.e. frame number over ``fps``, across the span
+    of processed frames. Boxes interpolated by the tracker are skipped so
+    they do not double-count detections.
+    """
+
+    def __init__(self, fps: Optional[float]):
+        self.fps = fps
+        self.frames = 0
+        self.cpu_total = 0.0
+        self.memory_total = 0.0
+        self.first_frame: Optional[int] = None
+        self.last_frame: Optional[int] = None
+        self.class_counts: Dict[str, int] = {}
+        self.confidence_totals: Dict[str, float] = {}
+        self.confidence_histograms: Dict[str, np.ndarray] = {}
+        self.tracks: Dict[str, Set[int]] = {}
+        self.per_second: Dict[int, List[int]] = {}
+
+    def add(self, columns: DetectionColumns) -> None:
+        data = columns.columns
+        keep = ~data['interpolated']
+        frame_rows = keep & (data['detection_index'] <= 0)
+        detection_rows = keep & (data['detection_index'] >= 0)
+
+        frame_numbers = data['frame_number'][frame_rows]
+        self.frames += len(frame_numbers)
+        self.cpu_total += float(data['cpu_percent'][frame_rows].sum(dtype=np.float64))
+        self.memory_total += float(data['memory_percent'][frame_rows].sum(dtype=np.float64))
+        if len(frame_numbers):
+            first, last = int(frame_numbers.min()), int(frame_numbers.max())
+            self.first_frame = first if self.first_frame is None else min(self.first_frame, first)
+            self.last_frame = last if self.last_frame is None else max(self.last_frame, last)
+
+        # Per-class counts, confidence sums and histograms, by chunk class code
+        codes = data['class'][detection_rows].astype(np.int64)
+        confidence = data['confidence'][detection_rows]
+        track_ids = data['track_id'][detection_rows]
+        num_classes = len(columns.classes)
+        counts = np.bincount(codes, minlength=num_classes)
+        totals = np.bincount(codes, weights=confidence, minlength=num_classes)
+        bins = np.clip(np.rint(confidence * CONFIDENCE_BINS).astype(np.int64), 0, CONFIDENCE_BINS)
+        histograms = np.bincount(
+            codes * (CONFIDENCE_BINS + 1) + bins, minlength=num_classes * (CONFIDENCE_BINS + 1)
+        ).reshape(num_classes, CONFIDENCE_BINS + 1)
+        for code, class_name in enumerate(columns.classes):
+            if not counts[code]:
+                continue
+            self.class_counts[class_name] = self.class_counts.get(class_name, 0) + int(counts[code])
+            self.confidence_totals[class_name] = self.confidence_totals.get(class_name, 0.0) + float(totals[code])
+            if class_name not in self.confidence_histograms:
+                self.confidence_histograms[class_name] = np.zeros(CONFIDENCE_BINS + 1, dtype=np.int64)
+            self.confidence_histograms[class_name] += histograms[code]
+            ids = track_ids[(codes == code) & (track_ids >= 0)]
+            if len(ids):
+                self.tracks.setdefault(class_name, set()).update(np.unique(ids).tolist())
+
+        if self.fps and len(frame_numbers):
+            seconds, inverse = np.unique((frame_numbers // self.fps).astype(np.int64), return_inverse=True)
+            frame_counts = np.bincount(inverse)
+            detection_counts = np.bincount(inverse, weights=data['detection_count'][frame_rows])
+            for second, frame_count, detection_count in zip(
+                seconds.tolist(), frame_counts.tolist(), detection_counts.tolist()
+            ):
+                entry = self.per_second.setdefault(second, [0, 0])
+                entry[0] += frame_count
+                entry[1] += int(detection_count)
+
+    @staticmethod
+    def _percentile(histogram: np.ndarray, q: float) -> float:
+        cumulative = np.cumsum(histogram)
+        index = int(np.searchsorted(cumulative, q * cumulative[-1]))
+        return round(index / CONFIDENCE_BINS, 3)
+
+    def statistics(self) -> Dict[str, Any]:
+        total_detections = sum(self.class_counts.values())
+        statistics = {
+            'total_frames': self.frames,
+            'total_detections': total_detections,
+            'avg_cpu_usage': self.cpu_total / self.frames if self.frames else None,
+            'avg_memory_usage': self.memory_total / self.frames if self.frames else None,
+            'detection_by_class': dict(self.class_counts),
+            'unique_individuals_by_class': {name: len(ids) for name, ids in self.tracks.items()},
+            'confidence_by_class': {
+                name: {
+                    'mean': round(self.confidence_totals[name] / count, 4),
+                    **{f"p{int(q * 100)}": self._percentile(self.confidence_histograms[name], q)
+                       for q in CONFIDENCE_PERCENTILES}
+                }
+                for name, count in self.class_counts.items()
+            },
+            'duration_seconds': None,
+            'detections_per_minute': None,
+            'detections_per_second': [
+                {'second': second, 'frames': frame_count, 'detections': detection_count}
+                for second, (frame_count, detection_count) in sorted(self.per_second.items())
+            ]
+        }
+        if self.fps and self.frames:
+            duration = (self.last_frame - self.first_frame + 1) / self.fps
+            statistics['duration_seconds'] = duration
+            statistics['detections_per_minute'] = total_detections * 60.0 / duration
+        return statistics
+
+
+class _CsvChunkWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self._file = open(path, 'w', newline='')
+        self._header = True
+
+    def write(self, columns: DetectionColumns) -> None:
+        columns.to_pandas().to_csv(self._file, header=self._header, index=False)
+        self._header = False
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class _ParquetChunkWriter:
+    """Write each chunk as one row group of a single Parquet file."""
+
+    def __init__(self, path: Path, compression: str):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)")
+        self._pq = pq
+        self.path = path
+        self.compression = compression
+        self._writer = None
+
+    def write(self, columns: DetectionColumns) -> None:
+        table = columns.to_arrow()
+        if self._writer is None:
+            self._writer = self._pq.ParquetWriter(self.path, table.schema, compression=self.compression)
+        self._writer.write_table(table)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
 
 class ResultsExporter:
     def __init__(self, input_path: str, output_dir: str):
@@ -20,112 +290,129 @@ class ResultsExporter:
         self.logger = logging.getLogger(__name__)
 
     def load_results(self) -> Dict[str, Any]:
-        """Load results from JSON file."""
+        """Open a JSON or JSONL results file with its frames streamed, not loaded."""
         try:
-            with open(self.input_path) as f:
-                return json.load(f)
+            if self.input_path.suffix == '.jsonl':
+                return JsonlResults(self.input_path).to_results()
+            return JsonResults(self.input_path).to_results()
         except Exception as e:
             self.logger.error(f"Error loading results: {str(e)}")
             raise
 
-    def export_csv(self, results: Dict[str, Any]) -> None:
+    def _csv_path(self) -> Path:
+        return self.output_dir / f"{self.input_path.stem}_detections.csv"
+
+    def _parquet_path(self, results: Dict[str, Any]) -> Path:
+        """Partition of the ``detections`` dataset for this video."""
+        video_name = Path(results['video_info'].get('path', self.input_path.stem)).stem
+        partition_dir = self.output_dir / 'detections' / f"video={video_name}"
+        partition_dir.mkdir(parents=True, exist_ok=True)
+        return partition_dir / 'part-0.parquet'
+
+    def _summary_path(self) -> Path:
+        return self.output_dir / f"{self.input_path.stem}_summary.json"
+
+    def _export(self, results: Dict[str, Any], writers: List[Any],
+                summary: Optional[SummaryAccumulator] = None, chunk_frames: int = CHUNK_FRAMES) -> None:
+        """Stream the frames once, in chunks, into every writer and the summary."""
+        try:
+            for columns in DetectionColumns.chunks(results['frame_results'], chunk_frames):
+                for writer in writers:
+                    writer.write(columns)
+                if summary is not None:
+                    summary.add(columns)
+        finally:
+            for writer in writers:
+                writer.close()
+
+    def _write_summary(self, results: Dict[str, Any], summary: SummaryAccumulator) -> None:
+        output_path = self._summary_path()
+        with open(output_path, 'w') as f:
+            json.dump({
+                'video_info': results['video_info'],
+                'processing_info': results['processing_info'],
+                'statistics': summary.statistics()
+            }, f, indent=2)
+        self.logger.info(f"Exported summary to: {output_path}")
+
+    def export_csv(self, results: Dict[str, Any], chunk_frames: int = CHUNK_FRAMES) -> None:
         """Export frame results to CSV format."""
         try:
-            # Extract frame-level data
-            frames_data = []
-            for frame in results['frame_results']:
-                frame_base = {
-                    'frame_number': frame['frame_number'],
-                    'timestamp': frame['timestamp'],
-                    'cpu_percent': frame['system_stats']['cpu_percent'],
-                    'memory_percent': frame['system_stats']['memory_percent'],
-                    'detection_count': len(frame['predictions'])
-                }
-                
-                # Add individual detections
-                if frame['predictions']:
-                    for i, pred in enumerate(frame['predictions']):
-                        frame_data = frame_base.copy()
-                        frame_data.update({
-                            'detection_index': i,
-                            'class': pred['class'],
-                            'confidence': pred['confidence'],
-                            'x': pred['x'],
-                            'y': pred['y'],
-                            'width': pred['width'],
-                            'height': pred['height']
-                        })
-                        frames_data.append(frame_data)
-                else:
-                    frame_base.update({
-                        'detection_index': None,
-                        'class': None,
-                        'confidence': None,
-                        'x': None,
-                        'y': None,
-                        'width': None,
-                        'height': None
-                    })
-                    frames_data.append(frame_base)
-            
-            # Convert to DataFrame and save
-            df = pd.DataFrame(frames_data)
-            output_path = self.output_dir / f"{self.input_path.stem}_detections.csv"
-            df.to_csv(output_path, index=False)
+            output_path = self._csv_path()
+            self._export(results, [_CsvChunkWriter(output_path)], chunk_frames=chunk_frames)
             self.logger.info(f"Exported CSV to: {output_path}")
             
         except Exception as e:
             self.logger.error(f"Error exporting CSV: {str(e)}")
             raise
 
-    def export_summary(self, results: Dict[str, Any]) -> None:
-        """Export processing summary."""
+    def export_parquet(self, results: Dict[str, Any], compression: str = 'zstd',
+                       chunk_frames: int = CHUNK_FRAMES) -> None:
+        """Export frame results to a Parquet dataset partitioned by video.
+
+        Each video is written to ``detections/video={name}/``, so the
+        ``detections`` directory of a survey can be read as one dataset.
+        """
         try:
-            summary = {
-                'video_info': results['video_info'],
-                'processing_info': results['processing_info'],
-                'statistics': {
-                    'total_frames': len(results['frame_results']),
-                    'total_detections': sum(len(f['predictions']) for f in results['frame_results']),
-                    'avg_cpu_usage': sum(f['system_stats']['cpu_percent'] for f in results['frame_results']) / len(results['frame_results']),
-                    'avg_memory_usage': sum(f['system_stats']['memory_percent'] for f in results['frame_results']) / len(results['frame_results']),
-                    'detection_by_class': self._count_detections_by_class(results['frame_results'])
-                }
-            }
+            output_path = self._parquet_path(results)
+            self._export(results, [_ParquetChunkWriter(output_path, compression)], chunk_frames=chunk_frames)
+            self.logger.info(f"Exported Parquet to: {output_path}")
             
-            output_path = self.output_dir / f"{self.input_path.stem}_summary.json"
-            with open(output_path, 'w') as f:
-                json.dump(summary, f, indent=2)
-            self.logger.info(f"Exported summary to: {output_path}")
+        except Exception as e:
+            self.logger.error(f"Error exporting Parquet: {str(e)}")
+            raise
+
+    def export_summary(self, results: Dict[str, Any], chunk_frames: int = CHUNK_FRAMES) -> None:
+        """Export processing summary."""
+        try:
+            summary = SummaryAccumulator(results['video_info'].get('fps'))
+            self._export(results, [], summary, chunk_frames=chunk_frames)
+            self._write_summary(results, summary)
             
         except Exception as e:
             self.logger.error(f"Error exporting summary: {str(e)}")
             raise
 
-    def _count_detections_by_class(self, frame_results: List[Dict[str, Any]]) -> Dict[str, int]:
-        """Count total detections for each class."""
-        class_counts = {}
-        for frame in frame_results:
-            for pred in frame['predictions']:
-                class_name = pred['class']
-                class_counts[class_name] = class_counts.get(class_name, 0) + 1
-        return class_counts
+    def export_all(self, formats: Iterable[str] = ('csv',), compression: str = 'zstd',
+                   chunk_frames: int = CHUNK_FRAMES) -> None:
+        """Export detections in the given formats, plus the summary, in one pass.
 
-    def export_all(self) -> None:
-        """Export results in all formats."""
+        Frames are read and converted ``chunk_frames`` at a time, so peak
+        memory does not depend on the length of the video.
+        """
         results = self.load_results()
-        self.export_csv(results)
-        self.export_summary(results)
+        summary = SummaryAccumulator(results['video_info'].get('fps'))
+        writers = []
+        try:
+            if 'csv' in formats:
+                writers.append(_CsvChunkWriter(self._csv_path()))
+            if 'parquet' in formats:
+                writers.append(_ParquetChunkWriter(self._parquet_path(results), compression))
+            self._export(results, writers, summary, chunk_frames=chunk_frames)
+        except Exception as e:
+            for writer in writers:
+                writer.close()
+            self.logger.error(f"Error exporting results: {str(e)}")
+            raise
+        for writer in writers:
+            self.logger.info(f"Exported {writer.path}")
+        self._write_summary(results, summary)
         self.logger.info("Export complete")
 
 def main():
     parser = argparse.ArgumentParser(description="Export processing results in various formats")
-    parser.add_argument('--input', required=True, help='Path to input JSON results file')
+    parser.add_argument('--input', required=True, help='Path to input JSON or JSONL results file')
     parser.add_argument('--output-dir', required=True, help='Directory for output files')
+    parser.add_argument('--format', nargs='+', default=['csv'], choices=['csv', 'parquet'],
+                        help='Detection export formats (default: csv)')
+    parser.add_argument('--compression', default='zstd', choices=PARQUET_COMPRESSION,
+                        help='Parquet compression codec (default: zstd)')
+    parser.add_argument('--chunk-frames', type=int, default=CHUNK_FRAMES,
+                        help=f'Frames converted and written per chunk (default: {CHUNK_FRAMES})')
     args = parser.parse_args()
     
     exporter = ResultsExporter(args.input, args.output_dir)
-    exporter.export_all()
+    exporter.export_all(args.format, compression=args.compression, chunk_frames=args.chunk_frames)
 
 if __name__ == "__main__":
     main()
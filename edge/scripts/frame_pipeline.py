@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+FrameItem = Tuple[int, np.ndarray]
+ProcessFn = Callable[[np.ndarray, int], Optional[Dict[str, Any]]]
+BatchFn = Callable[[List[np.ndarray], List[int]], List[Optional[Dict[str, Any]]]]
+
+_SENTINEL = object()
+
+
+class FramePipeline:
+    """Overlap frame decoding, inference and result collection.
+
+    A decoder thread feeds frames into a bounded queue, ``num_workers``
+    threads call ``process_fn`` concurrently and the caller receives the
+    results back in decode order.
+
+    With ``batch_size > 1`` each worker collects up to ``batch_size`` frames
+    and hands them to ``batch_fn`` in one call. A partial batch is flushed
+    once ``max_batch_latency`` seconds have passed since its first frame.
+    """
+
+    def __init__(self, process_fn: ProcessFn, num_workers: int = 4,
+                 frame_queue_size: int = 32, result_queue_size: int = 64,
+                 batch_fn: Optional[BatchFn] = None, batch_size: int = 1,
+                 max_batch_latency: float = 0.05):
+        if num_workers < 1:
+            raise ValueError(f"num_workers must be >= 1, got {num_workers}")
+        if batch_size > 1 and batch_fn is None:
+            raise ValueError("batch_fn is required when batch_size > 1")
+        self.process_fn = process_fn
+        self.batch_fn = batch_fn
+        self.num_workers = num_workers
+        self.batch_size = max(1, batch_size)
+        self.max_batch_latency = max_batch_latency
+        # Keep at least one full batch per worker in flight
+        self.frame_queue_size = max(1, frame_queue_size, self.batch_size * num_workers)
+        self.result_queue_size = max(1, result_queue_size)
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def max_in_flight(self) -> int:
+        """Frames decoded but not yet yielded back to the caller."""
+        return self.frame_queue_size + self.result_queue_size
+
+    @classmethod
+    def from_config(cls, process_fn: ProcessFn, config: Dict[str, Any],
+                    batch_fn: Optional[BatchFn] = None, batch_size: int = 1,
+                    max_batch_latency: float = 0.05) -> 'FramePipeline':
+        """Build a pipeline from the ``processing.pipeline`` config section."""
+        return cls(
+            process_fn,
+            num_workers=config.get('inference_workers', 4),
+            frame_queue_size=config.get('frame_queue_size', 32),
+            result_queue_size=config.get('result_queue_size', 64),
+            batch_fn=batch_fn,
+            batch_size=batch_size,
+            max_batch_latency=max_batch_latency
+        )
+
+    def _next_batch(self, frame_queue: queue.Queue) -> Tuple[List[Tuple[int, int, np.ndarray]], bool]:
+        """Collect up to ``batch_size`` frames, returning (batch, saw_sentinel)."""
+        item = frame_queue.get()
+        if item is _SENTINEL:
+            return [], True
+        batch = [item]
+        deadline = time.monotonic() + self.max_batch_latency
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = frame_queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is _SENTINEL:
+                return batch, True
+            batch.append(item)
+        return batch, False
+
+    def run(self, frames: Iterable[FrameItem]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Process ``(frame_number, frame)`` pairs and yield results in order."""
+        frame_queue = queue.Queue(maxsize=self.frame_queue_size)
+        result_queue = queue.Queue(maxsize=self.result_queue_size)
+        # Bounds frames held anywhere in the pipeline, including the reorder
+        # buffer, so a stalled worker cannot let the others race ahead.
+        in_flight = threading.BoundedSemaphore(self.max_in_flight)
+        stop = threading.Event()
+        # Set once the collector has returned; nothing reads the queues after it
+        closed = threading.Event()
+        errors = []
+
+        def put(q: queue.Queue, item: Any) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        def report(q: queue.Queue, item: Any) -> None:
+            # Sentinels must arrive even after a stop so no reader waits forever
+            while not closed.is_set():
+                try:
+                    q.put(item, timeout=0.1)
+                    return
+                except queue.Full:
+                    continue
+
+        def decode() -> None:
+            try:
+                for seq, (frame_number, frame) in enumerate(frames):
+                    while not in_flight.acquire(timeout=0.1):
+                        if stop.is_set():
+                            return
+                    if not put(frame_queue, (seq, frame_number, frame)):
+                        return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                for _ in range(self.num_workers):
+                    report(frame_queue, _SENTINEL)
+
+        def infer() -> None:
+            try:
+                while True:
+                    batch, done = self._next_batch(frame_queue)
+                    if len(batch) == 1:
+                        seq, frame_number, frame = batch[0]
+                        results = [self.process_fn(frame, frame_number)]
+                    elif batch:
+                        results = self.batch_fn([b[2] for b in batch], [b[1] for b in batch])
+                        if len(results) != len(batch):
+                            raise RuntimeError(f"batch_fn returned {len(results)} results for {len(batch)} frames")
+                    else:
+                        results = []
+                    for (seq, frame_number, _), result in zip(batch, results):
+                        if not put(result_queue, (seq, frame_number, result)):
+                            return
+                    if done:
+                        return
+            except BaseException as e:
+                errors.append(e)
+                stop.set()
+            finally:
+                report(result_queue, _SENTINEL)
+
+        threads = [threading.Thread(target=decode, name='frame-decoder', daemon=True)]
+        threads += [
+            threading.Thread(target=infer, name=f'inference-worker-{i}', daemon=True)
+            for i in range(self.num_workers)
+        ]
+        for thread in threads:
+            thread.start()
+
+        pending = {}
+        next_seq = 0
+        finished_workers = 0
+        try:
+            while finished_workers < self.num_workers and not errors:
+                try:
+                    item = result_queue.get(timeout=0.1)
+                except queue.Empty:
+                    continue
+                if item is _SENTINEL:
+                    finished_workers += 1
+                    continue
+                seq, frame_number, result = item
+                pending[seq] = (frame_number, result)
+                while next_seq in pending and not errors:
+                    yield pending.pop(next_seq)
+                    in_flight.release()
+                    next_seq += 1
+                if errors:
+                    break
+
+            if errors:
+                raise errors[0]
+            # Sequence numbers are contiguous, so anything left means a
+            # worker exited without reporting its frame.
+            if pending:
+                raise RuntimeError(f"Pipeline finished with {len(pending)} unordered results")
+        finally:
+            stop.set()
+            closed.set()
+            # Unblock the decoder and any worker waiting on a full queue
+            for q in (frame_queue, result_queue):
+                try:
+                    while True:
+                        q.get_nowait()
+                except queue.Empty:
+                    pass
+            for _ in range(self.num_workers):
+                try:
+                    frame_queue.put_nowait(_SENTINEL)
+                except queue.Full:
+                    break
+            for thread in threads:
+                thread.join(timeout=1.0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+
+import itertools
+import logging
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class FrameSampler:
+    """Select frames from a capture to honour ``processing.fps_limit``.
+
+    Skipped frames are advanced with ``cap.grab()`` so they are never
+    converted to BGR. When the stride between selected frames reaches
+    ``seek_stride`` the capture seeks straight to the next target instead.
+    """
+
+    def __init__(self, source_fps: float, fps_limit: Optional[float] = None, seek_stride: int = 60):
+        self.source_fps = source_fps or 0.0
+        self.fps_limit = fps_limit or 0.0
+        self.seek_stride = seek_stride
+        self.logger = logging.getLogger(__name__)
+
+        if self.source_fps <= 0 or self.fps_limit <= 0 or self.fps_limit >= self.source_fps:
+            self.stride = 1.0
+            self.policy = 'all'
+        else:
+            self.stride = self.source_fps / self.fps_limit
+            self.policy = 'seek' if seek_stride and self.stride >= seek_stride else 'grab'
+
+    @classmethod
+    def from_config(cls, source_fps: float, processing_config: Dict[str, Any]) -> 'FrameSampler':
+        """Build a sampler from the ``processing`` config section."""
+        sampling = processing_config.get('sampling', {})
+        return cls(
+            source_fps,
+            fps_limit=processing_config.get('fps_limit'),
+            seek_stride=sampling.get('seek_stride', 60)
+        )
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the sampling policy for ``processing_info``."""
+        return {
+            'policy': self.policy,
+            'source_fps': self.source_fps,
+            'target_fps': self.fps_limit if self.policy != 'all' else self.source_fps,
+            'stride': round(self.stride, 3)
+        }
+
+    def target_indices(self) -> Iterator[int]:
+        """Yield the frame indices to process, evenly spaced in time."""
+        if self.policy == 'all':
+            yield from itertools.count()
+            return
+        # Rounding k * stride keeps non-integer ratios such as 29.97 / 5
+        # from drifting over long videos.
+        for k in itertools.count():
+            yield int(round(k * self.stride))
+
+    def frames(self, cap: cv2.VideoCapture, start_frame: int = 0) -> Iterator[Tuple[int, np.ndarray]]:
+        """Yield (frame_number, frame) pairs for the selected frames only.
+
+        With ``start_frame`` the capture seeks past already processed frames
+        and continues from the first target at or after it.
+        """
+        position = 0
+        for target in self.target_indices():
+            if target < start_frame:
+                continue
+            if (self.policy == 'seek' or position == 0) and target - position > 1:
+                if cap.set(cv2.CAP_PROP_POS_FRAMES, target):
+                    position = target
+            while position < target:
+                if not cap.grab():
+                    return
+                position += 1
+
+            ret, frame = cap.read()
+            if not ret:
+                return
+            position += 1
+            yield target, frame
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+
+"""
+Pluggable video decode backends behind one frame-source interface.
+
+Every source iterates as ``(index, pts_seconds, frame)`` and also offers
+the ``grab`` / ``read`` / ``set(CAP_PROP_POS_FRAMES)`` subset of
+``cv2.VideoCapture`` that ``FrameSampler`` relies on, so decode can be
+switched per device without touching the processing scripts.
+
+Backends:
+
+* ``opencv``: ``cv2.VideoCapture`` with default settings.
+* ``ffmpeg``: OpenCV's FFmpeg backend with a decoder thread count and a
+  hardware acceleration hint (``any``, ``vaapi``, ``drm``, ``d3d11``, ``mfx``).
+* ``pyav``: PyAV (libav) with frame/slice threaded decoding.
+* ``gstreamer``: an OpenCV GStreamer pipeline, e.g. ``nvv4l2decoder`` on Jetson.
+
+Sources can also produce frames at a target ``width`` / ``height`` and
+``pixel_format`` (``bgr24``, ``rgb24`` or ``gray``). PyAV scales in
+libswscale and GStreamer pipelines with a ``{caps}`` placeholder scale
+in the pipeline (``nvvidconv`` on Jetson). The OpenCV backends decode
+into one reused full-size buffer and scale from it. With ``buffers > 0``
+frames are written into a pool of up to that many arrays; a buffer is
+reused once the caller has dropped its frame, and frames are decoded into
+new arrays while every buffer is still held, so none is overwritten in use.
+"""
+
+import logging
+import os
+import sys
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('opencv', 'ffmpeg', 'pyav', 'gstreamer')
+
+DEFAULT_GSTREAMER_PIPELINE = (
+    'filesrc location="{path}" ! decodebin ! videoconvert ! videoscale ! '
+    'video/x-raw,format=BGR{caps} ! appsink sync=false'
+)
+
+# OpenCV conversion from the decoded BGR frame, None when already BGR
+PIXEL_FORMATS = {
+    'bgr24': None,
+    'rgb24': cv2.COLOR_BGR2RGB,
+    'gray': cv2.COLOR_BGR2GRAY
+}
+
+HWACCEL = {
+    'none': 'VIDEO_ACCELERATION_NONE',
+    'any': 'VIDEO_ACCELERATION_ANY',
+    'vaapi': 'VIDEO_ACCELERATION_VAAPI',
+    'drm': 'VIDEO_ACCELERATION_DRM',
+    'd3d11': 'VIDEO_ACCELERATION_D3D11',
+    'mfx': 'VIDEO_ACCELERATION_MFX'
+}
+
+# OPENCV_FFMPEG_CAPTURE_OPTIONS is read when a capture opens
+_ffmpeg_env_lock = threading.Lock()
+
+
+class FrameSource:
+    """Base class for decoded video sources."""
+
+    backend = ''
+
+    def __init__(self, width: int = 0, height: int = 0, pixel_format: str = 'bgr24', buffers: int = 0):
+        if pixel_format not in PIXEL_FORMATS:
+            raise ValueError(f"Unknown pixel format: {pixel_format}")
+        self.fps = 0.0
+        self.frame_count = 0
+        # Source dimensions; frame_size is what read() returns
+        self.width = 0
+        self.height = 0
+        self.position = 0
+        self.pts: Optional[float] = None
+        self.requested_size = (width or 0, height or 0)
+        self.pixel_format = pixel_format
+        self.buffers = max(0, buffers)
+        self.frame_size = (0, 0)
+        self._ring: List[np.ndarray] = []
+        self._ring_index = 0
+        self._scaled: Optional[np.ndarray] = None
+
+    def _resolve_frame_size(self) -> None:
+        """Fill in the output size once the source dimensions are known.
+
+        A missing width or height keeps the aspect ratio, rounded to even.
+        """
+        width, height = self.requested_size
+        if width and not height and self.width:
+            height = max(2, int(round(self.height * width / self.width / 2)) * 2)
+        elif height and not width and self.height:
+            width = max(2, int(round(self.width * height / self.height / 2)) * 2)
+        self.frame_size = (width or self.width, height or self.height)
+
+    @property
+    def scales(self) -> bool:
+        return self.frame_size != (self.width, self.height)
+
+    @property
+    def converts(self) -> bool:
+        return self.scales or self.pixel_format != 'bgr24'
+
+    def _output_buffer(self) -> Optional[np.ndarray]:
+        """A free array of the reuse ring, or None to allocate a fresh frame.
+
+        A buffer is free once the consumer has dropped every reference to
+        the frame, so the ring only grows to the number of frames actually
+        alive, up to ``buffers``. When all of them are still in use the
+        frame is decoded into a new array rather than overwriting one.
+        """
+        if not self.buffers:
+            return None
+        for _ in range(len(self._ring)):
+            index = self._ring_index
+            self._ring_index = (index + 1) % len(self._ring)
+            # Only the ring and this call's argument refer to a free buffer
+            if sys.getrefcount(self._ring[index]) <= 2:
+                return self._ring[index]
+        if len(self._ring) < self.buffers:
+            width, height = self.frame_size
+            shape = (height, width) if self.pixel_format == 'gray' else (height, width, 3)
+            self._ring.append(np.empty(shape, dtype=np.uint8))
+            return self._ring[-1]
+        return None
+
+    def _convert(self, frame: np.ndarray) -> np.ndarray:
+        """Scale and convert a decoded BGR frame into the output format."""
+        out = self._output_buffer()
+        code = PIXEL_FORMATS[self.pixel_format]
+        if frame.shape[1::-1] != self.frame_size:
+            if code is None:
+                return cv2.resize(frame, self.frame_size, dst=out, interpolation=cv2.INTER_AREA)
+            frame = self._scaled = cv2.resize(frame, self.frame_size, dst=self._scaled,
+                                              interpolation=cv2.INTER_AREA)
+        if code is not None:
+            frame = cv2.cvtColor(frame, code, dst=out)
+        return frame
+
+    def __enter__(self) -> 'FrameSource':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.release()
+
+    def __iter__(self) -> Iterator[Tuple[int, Optional[float], np.ndarray]]:
+        """Yield ``(index, pts_seconds, frame)`` from the current position."""
+        while True:
+            index = self.position
+            ret, frame = self.read()
+            if not ret:
+                return
+            yield index, self.pts, frame
+
+    def isOpened(self) -> bool:
+        return True
+
+    def grab(self) -> bool:
+        """Advance one frame without converting it to BGR."""
+        raise NotImplementedError
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """Decode the next frame as a BGR array."""
+        raise NotImplementedError
+
+    def seek(self, index: int) -> bool:
+        """Position the source so the next frame read is ``index``."""
+        return False
+
+    def set(self, prop: int, value: float) -> bool:
+        if prop == cv2.CAP_PROP_POS_FRAMES:
+            return self.seek(int(value))
+        return False
+
+    def get(self, prop: int) -> float:
+        return {
+            cv2.CAP_PROP_FPS: self.fps,
+            cv2.CAP_PROP_FRAME_COUNT: self.frame_count,
+            cv2.CAP_PROP_FRAME_WIDTH: self.width,
+            cv2.CAP_PROP_FRAME_HEIGHT: self.height,
+            cv2.CAP_PROP_POS_FRAMES: self.position
+        }.get(prop, 0.0)
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the backend for ``processing_info``."""
+        return {'backend': self.backend, **self._describe_output()}
+
+    def _describe_output(self) -> Dict[str, Any]:
+        return {
+            'frame_size': f"{self.frame_size[0]}x{self.frame_size[1]}",
+            'pixel_format': self.pixel_format,
+            'buffers': self.buffers
+        }
+
+    def release(self) -> None:
+        pass
+
+
+class OpenCVSource(FrameSource):
+    """``cv2.VideoCapture`` with an optional API preference and open parameters."""
+
+    backend = 'opencv'
+
+    def __init__(self, source: str, api_preference: int = cv2.CAP_ANY, params: Optional[List[int]] = None,
+                 **output):
+        super().__init__(**output)
+        if params:
+            self.cap = cv2.VideoCapture(source, api_preference, params)
+        else:
+            self.cap = cv2.VideoCapture(source, api_preference)
+        if not self.cap.isOpened():
+            raise RuntimeError(f"Could not open video with {self.backend} backend: {source}")
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS)
+        self.frame_count = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        self.width = int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        self.height = int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        self._resolve_frame_size()
+        self._decoded: Optional[np.ndarray] = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def grab(self) -> bool:
+        if not self.cap.grab():
+            return False
+        self.position += 1
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self.cap.grab():
+            return False, None
+        if self.converts:
+            # Decode into the same full-size buffer every time, then scale from it
+            ret, self._decoded = self.cap.retrieve(self._decoded)
+            frame = self._convert(self._decoded) if ret else None
+        else:
+            ret, frame = self.cap.retrieve(self._output_buffer())
+        if not ret:
+            return False, None
+        self.position += 1
+        msec = self.cap.get(cv2.CAP_PROP_POS_MSEC)
+        if msec >= 0:
+            self.pts = msec / 1000.0
+        else:
+            self.pts = (self.position - 1) / self.fps if self.fps else None
+        return True, frame
+
+    def seek(self, index: int) -> bool:
+        if not self.cap.set(cv2.CAP_PROP_POS_FRAMES, index):
+            return False
+        self.position = index
+        return True
+
+    def release(self) -> None:
+        self.cap.release()
+
+
+class FFmpegSource(OpenCVSource):
+    """OpenCV's FFmpeg backend with decoder threads and a hardware decode hint."""
+
+    backend = 'ffmpeg'
+
+    def __init__(self, path: str, threads: int = 0, hwaccel: str = 'none', **output):
+        if hwaccel not in HWACCEL:
+            raise ValueError(f"Unknown hwaccel: {hwaccel}")
+        self.threads = threads
+        self.hwaccel = hwaccel
+        params = []
+        if hwaccel != 'none' and hasattr(cv2, 'CAP_PROP_HW_ACCELERATION'):
+            params += [cv2.CAP_PROP_HW_ACCELERATION, getattr(cv2, HWACCEL[hwaccel])]
+        if not threads or hasattr(cv2, 'CAP_PROP_N_THREADS'):
+            if threads:
+                params += [cv2.CAP_PROP_N_THREADS, threads]
+            super().__init__(path, cv2.CAP_FFMPEG, params, **output)
+            return
+
+        # Older OpenCV builds only take the thread count from the environment
+        with _ffmpeg_env_lock:
+            previous = os.environ.get('OPENCV_FFMPEG_CAPTURE_OPTIONS')
+            os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = f"threads;{threads}"
+            try:
+                super().__init__(path, cv2.CAP_FFMPEG, params, **output)
+            finally:
+                if previous is None:
+                    del os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS']
+                else:
+                    os.environ['OPENCV_FFMPEG_CAPTURE_OPTIONS'] = previous
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'threads': self.threads, 'hwaccel': self.hwaccel,
+                **self._describe_output()}
+
+
+class GStreamerSource(OpenCVSource):
+    """OpenCV GStreamer pipeline ending in a BGR ``appsink``.
+
+    ``pipeline`` may contain ``{path}``, and ``{caps}`` where the output
+    width and height go when both are requested, so the pipeline scales.
+    Seeking depends on the pipeline; when it fails ``FrameSampler`` falls
+    back to grabbing frames.
+    """
+
+    backend = 'gstreamer'
+
+    def __init__(self, path: str, pipeline: Optional[str] = None, **output):
+        width, height = output.get('width', 0), output.get('height', 0)
+        caps = f",width={width},height={height}" if width and height else ''
+        self.pipeline = (pipeline or DEFAULT_GSTREAMER_PIPELINE).format(path=path, caps=caps)
+        super().__init__(self.pipeline, cv2.CAP_GSTREAMER, **output)
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'pipeline': self.pipeline, **self._describe_output()}
+
+
+class PyAVSource(FrameSource):
+    """PyAV decoder with threaded decoding.
+
+    Frames are scaled and converted by libswscale only on ``read``, so
+    grabbed frames never leave the decoder's pixel format. Output arrays
+    come from PyAV and are not taken from the reuse ring.
+    """
+
+    backend = 'pyav'
+
+    def __init__(self, path: str, threads: int = 0, thread_type: str = 'AUTO', **output):
+        super().__init__(**output)
+        try:
+            import av
+        except ImportError:
+            raise RuntimeError("The pyav decode backend requires PyAV (pip install av)")
+        self.threads = threads
+        self.container = av.open(path)
+        self.stream = self.container.streams.video[0]
+        self.stream.thread_type = thread_type
+        self.stream.thread_count = threads
+        self.fps = float(self.stream.average_rate or 0)
+        self.frame_count = self.stream.frames
+        self.width = self.stream.codec_context.width
+        self.height = self.stream.codec_context.height
+        self._resolve_frame_size()
+        self._start = float(self.stream.start_time * self.stream.time_base) if self.stream.start_time else 0.0
+        self._decoded = self.container.decode(self.stream)
+        self._pending = None
+
+    def _next_frame(self):
+        if self._pending is not None:
+            frame, self._pending = self._pending, None
+            return frame
+        return next(self._decoded, None)
+
+    def _frame_pts(self, frame) -> Optional[float]:
+        if frame.pts is None:
+            return self.position / self.fps if self.fps else None
+        return float(frame.pts * frame.time_base) - self._start
+
+    def grab(self) -> bool:
+        frame = self._next_frame()
+        if frame is None:
+            return False
+        self.position += 1
+        return True
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        frame = self._next_frame()
+        if frame is None:
+            return False, None
+        self.pts = self._frame_pts(frame)
+        self.position += 1
+        if not self.scales:
+            return True, frame.to_ndarray(format=self.pixel_format)
+        width, height = self.frame_size
+        return True, frame.to_ndarray(width=width, height=height, format=self.pixel_format,
+                                      interpolation='AREA')
+
+    def seek(self, index: int) -> bool:
+        if not self.fps:
+            return False
+        target = index / self.fps
+        offset = int((target + self._start) / self.stream.time_base)
+        self.container.seek(offset, stream=self.stream, backward=True, any_frame=False)
+        self._decoded = self.container.decode(self.stream)
+        self._pending = None
+        # Decode forward from the preceding keyframe to the target frame
+        while True:
+            frame = next(self._decoded, None)
+            if frame is None:
+                return False
+            pts = self._frame_pts(frame)
+            if pts is None or round(pts * self.fps) >= index:
+                self._pending = frame
+                self.position = index
+                return True
+
+    def describe(self) -> Dict[str, Any]:
+        return {'backend': self.backend, 'threads': self.threads, **self._describe_output()}
+
+    def release(self) -> None:
+        self.container.close()
+
+
+def resolve_decode_config(decode_config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Resolve ``backend: auto`` to the device's preferred decode settings."""
+    config = dict(decode_config or {})
+    if config.get('backend', 'opencv') != 'auto':
+        return config
+    try:
+        from base_config import DeviceConfig
+        device_decode = DeviceConfig().config.get('video_decode', {})
+    except Exception as e:
+        logger.warning(f"Could not load device config, using OpenCV decode: {str(e)}")
+        device_decode = {}
+    return {**config, **device_decode, 'backend': device_decode.get('backend', 'opencv')}
+
+
+def open_frame_source(path: str, decode_config: Optional[Dict[str, Any]] = None,
+                      buffers: int = 0) -> FrameSource:
+    """Open a video with the backend named in a ``video.decode`` config section.
+
+    ``width``, ``height`` and ``pixel_format`` in the section set the output
+    frames; ``buffers`` is the size of the reuse ring (0 disables reuse).
+    If the configured backend is unavailable or cannot open the file the
+    plain OpenCV backend is used instead.
+    """
+    config = resolve_decode_config(decode_config)
+    backend = config.get('backend', 'opencv')
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown decode backend: {backend}")
+    output = {
+        'width': config.get('width', 0),
+        'height': config.get('height', 0),
+        'pixel_format': config.get('pixel_format', 'bgr24'),
+        'buffers': buffers
+    }
+    if output['pixel_format'] not in PIXEL_FORMATS:
+        raise ValueError(f"Unknown pixel format: {output['pixel_format']}")
+
+    try:
+        if backend == 'ffmpeg':
+            return FFmpegSource(path, threads=config.get('threads', 0), hwaccel=config.get('hwaccel', 'none'),
+                                **output)
+        if backend == 'pyav':
+            return PyAVSource(path, threads=config.get('threads', 0), **output)
+        if backend == 'gstreamer':
+            return GStreamerSource(path, pipeline=config.get('gstreamer_pipeline'), **output)
+    except Exception as e:
+        logger.warning(f"{backend} decode backend failed, falling back to OpenCV: {str(e)}")
+    return OpenCVSource(path, **output)
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+HIGH_CONFIDENCE = 0.7
+HIGH_CONFIDENCE_COLOR = (0, 255, 0)
+LOW_CONFIDENCE_COLOR = (0, 255, 255)
+DEFAULT_QUEUE_SIZE = 32
+
+
+def prediction_boxes(predictions: List[Dict[str, Any]], frame_shape: Tuple[int, ...]) -> np.ndarray:
+    """Pixel corners (x1, y1, x2, y2) of normalized center-format predictions."""
+    h, w = frame_shape[:2]
+    if not predictions:
+        return np.empty((0, 4), dtype=np.int32)
+    centers = np.array([
+        [pred.get('x', 0.5), pred.get('y', 0.5), pred.get('width', 0), pred.get('height', 0)]
+        for pred in predictions
+    ], dtype=np.float32)
+    scale = np.array([w, h, w, h], dtype=np.float32)
+    corners = np.concatenate([centers[:, :2] - centers[:, 2:] / 2, centers[:, :2] + centers[:, 2:] / 2], axis=1)
+    return (corners * scale).astype(np.int32)
+
+
+def draw_predictions(frame: np.ndarray, predictions: List[Dict[str, Any]]) -> None:
+    """Draw boxes and labels; boxes of one color go out in a single polylines call."""
+    boxes = prediction_boxes(predictions, frame.shape)
+    if not len(boxes):
+        return
+    confidence = np.array([pred.get('confidence', 0) for pred in predictions])
+    high = confidence > HIGH_CONFIDENCE
+    # Rectangles as closed 4-point polygons: (x1,y1) (x2,y1) (x2,y2) (x1,y2)
+    polygons = boxes[:, [0, 1, 2, 1, 2, 3, 0, 3]].reshape(-1, 4, 1, 2)
+    for mask, color in ((high, HIGH_CONFIDENCE_COLOR), (~high, LOW_CONFIDENCE_COLOR)):
+        if mask.any():
+            cv2.polylines(frame, list(polygons[mask]), True, color, 2)
+
+    for (x1, y1, _, _), pred, is_high in zip(boxes.tolist(), predictions, high):
+        label = f"{pred.get('class', 'unknown')} {pred.get('confidence', 0):.2f}"
+        if pred.get('track_id') is not None:
+            label = f"#{pred['track_id']} {label}"
+        cv2.putText(
+            frame,
+            label,
+            (x1, y1 - 10),
+            cv2.FONT_HERSHEY_SIMPLEX,
+            0.5,
+            HIGH_CONFIDENCE_COLOR if is_high else LOW_CONFIDENCE_COLOR,
+            2
+        )
+
+
+def draw_overlay(frame: np.ndarray, frame_result: Dict[str, Any], overlay_config: Dict[str, Any],
+                 fps: Optional[float] = None) -> None:
+    """Draw the configured overlay elements onto a frame in place."""
+    lines = []
+    if overlay_config.get('show_system_stats'):
+        stats = frame_result['system_stats']
+        lines.append(f"CPU: {stats['cpu_percent']}% | MEM: {stats['memory_percent']}%")
+    if overlay_config.get('show_fps') and fps:
+        lines.append(f"FPS: {fps:.1f}")
+    for i, line in enumerate(lines):
+        cv2.putText(frame, line, (10, 30 + 30 * i), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+
+    if overlay_config.get('show_detections'):
+        draw_predictions(frame, frame_result['predictions'])
+
+
+class AnnotatedVideoWriter:
+    """Render overlays and encode an annotated video on a background thread.
+
+    ``write`` only queues the frame, so drawing and encoding overlap with
+    inference. The queue is bounded; a slow encoder applies backpressure
+    instead of buffering frames without limit. Frames must not be modified
+    by the caller after they are queued.
+    """
+
+    def __init__(self, path: str, fps: float, frame_size: Tuple[int, int],
+                 overlay_config: Dict[str, Any], queue_size: int = DEFAULT_QUEUE_SIZE,
+                 fourcc: str = 'mp4v'):
+        self.path = str(path)
+        self.overlay_config = overlay_config
+        self.logger = logging.getLogger(__name__)
+        self.writer = cv2.VideoWriter(self.path, cv2.VideoWriter_fourcc(*fourcc), fps, frame_size)
+        if not self.writer.isOpened():
+            raise RuntimeError(f"Could not open video writer: {self.path}")
+        self.frames_written = 0
+        self._queue: "queue.Queue[Optional[Tuple[np.ndarray, Dict[str, Any], Optional[float]]]]" = queue.Queue(queue_size)
+        self._last_write: Optional[float] = None
+        self._fps: Optional[float] = None
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name='overlay-writer', daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> 'AnnotatedVideoWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def write(self, frame: np.ndarray, frame_result: Dict[str, Any]) -> None:
+        """Queue a frame and its result for drawing and encoding."""
+        if self._error is not None:
+            raise RuntimeError(f"Annotated video writer failed: {str(self._error)}")
+        # Processing rate, smoothed over recent frames
+        now = time.perf_counter()
+        if self._last_write is not None and now > self._last_write:
+            rate = 1.0 / (now - self._last_write)
+            self._fps = rate if self._fps is None else 0.9 * self._fps + 0.1 * rate
+        self._last_write = now
+        self._queue.put((frame, frame_result, self._fps))
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            if self._error is not None:
+                continue
+            frame, frame_result, fps = item
+            try:
+                draw_overlay(frame, frame_result, self.overlay_config, fps)
+                self.writer.write(frame)
+                self.frames_written += 1
+            except Exception as e:
+                self.logger.error(f"Error writing annotated frame {frame_result.get('frame_number')}: {str(e)}")
+                self._error = e
+
+    def close(self) -> None:
+        """Finish the queued frames and close the video file."""
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+        self.writer.release()
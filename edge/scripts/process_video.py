@@ -1,19 +1,39 @@
 #!/usr/bin/env python3
 
 import argparse
+import glob
 import yaml
 import cv2
-import json
 import logging
 import os
 import psutil
+import sys
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import closing
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from inference_sdk import InferenceHTTPClient
-from typing import Dict, Any
+from inference_sdk import InferenceConfiguration, InferenceHTTPClient
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from frame_pipeline import FramePipeline
+from frame_sampler import FrameSampler
+from frame_source import open_frame_source
+from overlay_writer import DEFAULT_QUEUE_SIZE, AnnotatedVideoWriter
+from scene_filter import SceneChangeFilter
+from result_writer import JsonlResultWriter, jsonl_to_json, load_checkpoint, read_footer
+from system_stats import SystemStatsSampler
+from tracker import IoUTracker
+
+# Device configs live alongside base_config.py in the edge root, and the
+# shared-memory and raw-frame transports ship with the inference server
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'docker' / 'inference'))
 
 class VideoProcessor:
     def __init__(self, config_path: str):
+        self.config_path = config_path
         with open(config_path) as f:
             self.config = yaml.safe_load(f)
         
@@ -25,15 +45,62 @@ class VideoProcessor:
         self.logger = logging.getLogger(__name__)
         
         # Initialize inference client
-        self.client = InferenceHTTPClient(
-            api_url=self.config['inference']['api_url'],
-            api_key=os.environ.get('ROBOFLOW_API_KEY')
+        self.batch_size = self._resolve_batch_size()
+        transport = self.config['inference'].get('transport', 'http')
+        if transport == 'shm':
+            from shm_transport import ShmInferenceClient
+            self.client = ShmInferenceClient(
+                self.config['inference']['api_url'],
+                slots=self._shm_slot_count()
+            )
+        elif transport == 'raw':
+            from frame_codec import RawFrameClient
+            self.client = RawFrameClient(self.config['inference']['api_url'])
+        elif transport == 'http_batch':
+            from frame_codec import BatchUploadClient
+            self.client = BatchUploadClient(self.config['inference']['api_url'])
+        else:
+            self.client = InferenceHTTPClient(
+                api_url=self.config['inference']['api_url'],
+                api_key=os.environ.get('ROBOFLOW_API_KEY')
+            )
+            if self.batch_size > 1:
+                self.client.configure(InferenceConfiguration(max_batch_size=self.batch_size))
+        
+        # Overlays are only drawn when an annotated video is requested
+        self.annotate = self.config['processing']['overlay'].get('write_video', False)
+        
+        # Near-duplicate frames reuse the last inferred frame's predictions
+        self.scene_filter = SceneChangeFilter.from_config(self.config['processing'])
+        
+        # System stats are sampled off the per-frame path
+        self.stats_sampler = SystemStatsSampler(
+            interval=self.config['processing'].get('system_stats', {}).get('interval_seconds', 1.0),
+            timestamp_format=self.config['processing']['timestamp_format']
         )
         
         # Create output directory
         os.makedirs(self.config['system']['temp_directory'], exist_ok=True)
         os.makedirs(self.config['video']['output_path'], exist_ok=True)
 
+    def _resolve_batch_size(self) -> int:
+        """Resolve inference.batch_size, using the device limit for 'auto'."""
+        batch_size = self.config['inference'].get('batch_size', 1)
+        if batch_size == 'auto':
+            try:
+                from base_config import DeviceConfig
+                batch_size = DeviceConfig().get_optimized_batch_size()
+            except Exception as e:
+                self.logger.warning(f"Could not load device config, using batch size 1: {str(e)}")
+                batch_size = 1
+        return max(1, int(batch_size))
+
+    def _shm_slot_count(self) -> int:
+        """Ring slots for the shm transport: at least one full batch per inference worker."""
+        pipeline_config = self.config['processing'].get('pipeline', {})
+        workers = pipeline_config.get('inference_workers', 4) if pipeline_config.get('enabled', False) else 1
+        return max(self.config['inference'].get('shm_slots', 8), self.batch_size * workers)
+
     def check_system_resources(self) -> bool:
         """Check if system meets minimum requirements."""
         memory_gb = psutil.virtual_memory().available / (1024**3)
@@ -50,13 +117,8 @@ class VideoProcessor:
         return True
 
     def get_system_stats(self) -> Dict[str, Any]:
-        """Get current system statistics."""
-        return {
-            'timestamp': datetime.now().strftime(self.config['processing']['timestamp_format']),
-            'cpu_percent': psutil.cpu_percent(),
-            'memory_percent': psutil.virtual_memory().percent,
-            'available_memory_gb': psutil.virtual_memory().available / (1024**3)
-        }
+        """Get the latest sampled system statistics (shared, read-only)."""
+        return self.stats_sampler.latest()
 
     def process_frame(self, frame: np.ndarray, frame_number: int) -> Dict[str, Any]:
         """Process a single frame."""
@@ -64,101 +126,242 @@ class VideoProcessor:
             # Get system stats
             stats = self.get_system_stats()
             
+            reference = self.scene_filter.reference_for(frame_number)
+            if reference is not None:
+                return self._build_reused_result(frame, frame_number, reference, stats)
+            
             # Run inference
             result = self.client.infer(
                 frame,
                 model_id=self.config['inference']['model_id']
             )
             
-            # Filter predictions by confidence
-            predictions = [
-                pred for pred in result.get('predictions', [])
-                if pred.get('confidence', 0) > self.config['inference']['confidence_threshold']
-            ]
+            return self._build_frame_result(frame, frame_number, result, stats)
             
-            # Prepare frame result
-            frame_result = {
-                'frame_number': frame_number,
-                'timestamp': stats['timestamp'],
-                'predictions': predictions,
-                'system_stats': stats
-            }
+        except Exception as e:
+            self.logger.error(f"Error processing frame {frame_number}: {str(e)}")
+            return None
+
+    def process_batch(self, frames: List[np.ndarray], frame_numbers: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """Process several frames with a single inference request."""
+        try:
+            stats = self.get_system_stats()
+            references = [self.scene_filter.reference_for(n) for n in frame_numbers]
+            frame_results = [
+                self._build_reused_result(frame, frame_number, reference, stats) if reference is not None else None
+                for frame, frame_number, reference in zip(frames, frame_numbers, references)
+            ]
             
-            # Draw overlay if enabled
-            if any(self.config['processing']['overlay'].values()):
-                self.draw_overlay(frame, frame_result)
+            # Only frames the scene filter kept go to the model
+            to_infer = [i for i, reference in enumerate(references) if reference is None]
+            if to_infer:
+                batch_results = self.client.infer(
+                    [frames[i] for i in to_infer],
+                    model_id=self.config['inference']['model_id']
+                )
+                for i, result in zip(to_infer, batch_results):
+                    frame_results[i] = self._build_frame_result(frames[i], frame_numbers[i], result, stats)
             
-            return frame_result
+            return frame_results
             
         except Exception as e:
-            self.logger.error(f"Error processing frame {frame_number}: {str(e)}")
-            return None
+            self.logger.error(f"Error processing frames {frame_numbers[0]}-{frame_numbers[-1]}: {str(e)}")
+            return [None] * len(frames)
 
-    def draw_overlay(self, frame: np.ndarray, frame_result: Dict[str, Any]) -> None:
-        """Draw overlay information on frame."""
-        overlay = self.config['processing']['overlay']
-        h, w = frame.shape[:2]
+    def _build_frame_result(self, frame: np.ndarray, frame_number: int,
+                            result: Dict[str, Any], stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Filter predictions by confidence and assemble the frame result."""
+        predictions = [
+            pred for pred in result.get('predictions', [])
+            if pred.get('confidence', 0) > self.config['inference']['confidence_threshold']
+        ]
         
-        if overlay['show_system_stats']:
-            stats = frame_result['system_stats']
-            cv2.putText(
-                frame,
-                f"CPU: {stats['cpu_percent']}% | MEM: {stats['memory_percent']}%",
-                (10, 30),
-                cv2.FONT_HERSHEY_SIMPLEX,
-                0.7,
-                (255, 255, 255),
-                2
-            )
+        frame_result = {
+            'frame_number': frame_number,
+            'timestamp': stats['timestamp'],
+            'predictions': predictions,
+            'system_stats': stats
+        }
+        
+        # Carried to the annotated video writer, never to the results file
+        if self.annotate:
+            frame_result['frame'] = frame
+        
+        return frame_result
+
+    def _build_reused_result(self, frame: np.ndarray, frame_number: int, reference: int,
+                             stats: Dict[str, Any]) -> Dict[str, Any]:
+        """Result for a frame that reuses the predictions of frame ``reference``.
         
-        if overlay['show_detections']:
-            for pred in frame_result['predictions']:
-                self.draw_prediction(frame, pred)
-
-    def draw_prediction(self, frame: np.ndarray, prediction: Dict[str, Any]) -> None:
-        """Draw a single prediction on the frame."""
-        h, w = frame.shape[:2]
-        x = prediction.get('x', 0.5)
-        y = prediction.get('y', 0.5)
-        width = prediction.get('width', 0)
-        height = prediction.get('height', 0)
-        
-        x1 = int((x - width/2) * w)
-        y1 = int((y - height/2) * h)
-        x2 = int((x + width/2) * w)
-        y2 = int((y + height/2) * h)
-        
-        confidence = prediction.get('confidence', 0)
-        class_name = prediction.get('class', 'unknown')
-        
-        color = (0, 255, 0) if confidence > 0.7 else (0, 255, 255)
-        cv2.rectangle(frame, (x1, y1), (x2, y2), color, 2)
-        cv2.putText(
-            frame,
-            f"{class_name} {confidence:.2f}",
-            (x1, y1 - 10),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.5,
-            color,
-            2
+        The predictions are filled in by the in-order consumer in
+        ``process_video``, since the reference may still be in flight.
+        """
+        frame_result = {
+            'frame_number': frame_number,
+            'timestamp': stats['timestamp'],
+            'predictions': [],
+            'reused_from': reference,
+            'system_stats': stats
+        }
+        if self.annotate:
+            frame_result['frame'] = frame
+        return frame_result
+
+    def process_frames(self, frames: Iterator[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+        """Process frames on the calling thread, batching when configured."""
+        if self.batch_size == 1:
+            for frame_number, frame in frames:
+                yield frame_number, self.process_frame(frame, frame_number)
+            return
+        
+        while True:
+            batch = list(islice(frames, self.batch_size))
+            if not batch:
+                return
+            frame_numbers = [frame_number for frame_number, _ in batch]
+            batch_results = self.process_batch([frame for _, frame in batch], frame_numbers)
+            yield from zip(frame_numbers, batch_results)
+
+    def results_paths(self, video_path: str) -> Tuple[Path, Path]:
+        """Paths of the JSONL results file and its checkpoint for a video."""
+        output_base = Path(self.config['video']['output_path'])
+        video_name = Path(video_path).stem
+        return (
+            output_base / f"{video_name}_results.jsonl",
+            output_base / f"{video_name}_results.checkpoint.json"
         )
 
-    def process_video(self, video_path: str) -> Dict[str, Any]:
-        """Process entire video file."""
+    def results_up_to_date(self, video_path: str) -> bool:
+        """Check for complete results written after the video was last modified."""
+        results_path, checkpoint_path = self.results_paths(video_path)
+        if checkpoint_path.exists() or not results_path.exists():
+            return False
+        if results_path.stat().st_mtime < os.path.getmtime(video_path):
+            return False
+        return read_footer(results_path) is not None
+
+    def expand_input_paths(self) -> List[str]:
+        """Expand the video.input_paths globs into a list of video files."""
+        videos = []
+        for entry in self.config['video'].get('input_paths', []):
+            if isinstance(entry, str):
+                entry = {'type': 'local', 'path': entry}
+            if entry.get('type', 'local') != 'local':
+                self.logger.warning(f"Skipping unsupported input type: {entry.get('type')}")
+                continue
+            matches = sorted(glob.glob(os.path.expanduser(entry['path'])))
+            if not matches:
+                self.logger.warning(f"No videos match: {entry['path']}")
+            videos.extend(m for m in matches if m not in videos)
+        return videos
+
+    def _resolve_video_workers(self) -> int:
+        """Resolve video.workers, using the device's recommended thread count for 'auto'."""
+        workers = self.config['video'].get('workers', 'auto')
+        if workers == 'auto':
+            try:
+                from base_config import DeviceConfig
+                workers = DeviceConfig().config['constraints']['recommended_thread_count']
+            except Exception as e:
+                workers = os.cpu_count() or 1
+                self.logger.warning(f"Could not load device config, using {workers} workers: {str(e)}")
+        return max(1, int(workers))
+
+    def process_videos(self, video_paths: Optional[List[str]] = None, resume: bool = False,
+                       workers: Optional[int] = None) -> Dict[str, str]:
+        """Process several videos across a process pool.
+
+        Defaults to every video matched by video.input_paths. Videos with
+        complete, newer results are skipped. Returns a status per video.
+        """
+        if video_paths is None:
+            video_paths = self.expand_input_paths()
+        
+        status = {}
+        pending = []
+        for video_path in video_paths:
+            if self.results_up_to_date(video_path):
+                status[video_path] = 'skipped'
+            else:
+                pending.append(video_path)
+        self.logger.info(f"{len(pending)} videos to process, {len(status)} already up to date")
+        
+        workers = min(workers or self._resolve_video_workers(), len(pending))
+        if workers <= 1:
+            for video_path in pending:
+                status[video_path] = _process_video_task(self.config_path, video_path, resume)
+            return status
+        
+        self.logger.info(f"Processing videos with {workers} worker processes")
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {
+                executor.submit(_process_video_task, self.config_path, video_path, resume): video_path
+                for video_path in pending
+            }
+            for future in as_completed(futures):
+                video_path = futures[future]
+                try:
+                    status[video_path] = future.result()
+                except Exception as e:
+                    status[video_path] = f"failed: {str(e)}"
+                self.logger.info(f"{video_path}: {status[video_path]}")
+        
+        return status
+
+    def _decode_buffer_count(self, pipeline: Optional[FramePipeline]) -> int:
+        """Cap on the decode buffer pool, or 0 when buffers are not reused.
+
+        Counts every frame that can still be referenced when a new one is
+        decoded: those in the pipeline or the current batch, the one held by
+        the decoder, the one in the results loop and, when annotating, the
+        annotated video queue plus the frame being drawn. The pool only
+        allocates buffers for frames that are actually alive.
+        """
+        if not self.config['video'].get('decode', {}).get('reuse_buffers', False):
+            return 0
+        held = pipeline.max_in_flight if pipeline else self.batch_size
+        if self.annotate:
+            held += DEFAULT_QUEUE_SIZE + 1
+        return held + 2
+
+    def process_video(self, video_path: str, resume: bool = False) -> Dict[str, Any]:
+        """Process entire video file, optionally resuming from a checkpoint."""
         if not self.check_system_resources():
             raise RuntimeError("System requirements not met")
         
-        self.logger.info(f"Processing video: {video_path}")
-        cap = cv2.VideoCapture(video_path)
+        output_base = Path(self.config['video']['output_path'])
+        video_name = Path(video_path).stem
+        results_path, checkpoint_path = self.results_paths(video_path)
+        
+        checkpoint = load_checkpoint(checkpoint_path) if resume else None
+        if checkpoint and checkpoint.get('video_path') != video_path:
+            raise RuntimeError(f"Checkpoint {checkpoint_path} belongs to {checkpoint.get('video_path')}")
+        if resume and checkpoint is None:
+            if read_footer(results_path):
+                self.logger.info(f"Results already complete: {results_path}")
+                return {'results_path': str(results_path)}
+            self.logger.warning(f"No checkpoint found at {checkpoint_path}, starting from frame 0")
         
-        if not cap.isOpened():
-            raise RuntimeError(f"Could not open video: {video_path}")
+        self.logger.info(f"Processing video: {video_path}")
+        pipeline_config = self.config['processing'].get('pipeline', {})
+        pipeline = None
+        if pipeline_config.get('enabled', False):
+            pipeline = FramePipeline.from_config(
+                self.process_frame,
+                pipeline_config,
+                batch_fn=self.process_batch,
+                batch_size=self.batch_size,
+                max_batch_latency=self.config['inference'].get('max_batch_latency_ms', 50) / 1000.0
+            )
+        cap = open_frame_source(video_path, self.config['video'].get('decode'),
+                                buffers=self._decode_buffer_count(pipeline))
         
         # Get video properties
         fps = cap.get(cv2.CAP_PROP_FPS)
         frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
         width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
         height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        sampler = FrameSampler.from_config(fps, self.config['processing'])
         
         # Prepare results
         results = {
@@ -171,26 +374,116 @@ class VideoProcessor:
             },
             'processing_info': {
                 'model_id': self.config['inference']['model_id'],
-                'confidence_threshold': self.config['inference']['confidence_threshold']
+                'confidence_threshold': self.config['inference']['confidence_threshold'],
+                'batch_size': self.batch_size,
+                'transport': self.config['inference'].get('transport', 'http'),
+                'decode': cap.describe(),
+                'sampling': sampler.describe(),
+                'scene_filter': self.scene_filter.describe(),
+                'tracking': self.config['processing'].get('tracking', {'enabled': False})
             },
-            'frame_results': []
+            'frames_written': 0
         }
         
+        # Tracks, ids and counts continue from the checkpoint on resume
+        tracker = IoUTracker.from_config(self.config['processing'])
+        interpolate = self.config['processing'].get('tracking', {}).get('interpolate', False)
+        checkpoint_context = {'video_path': video_path}
+        if tracker and checkpoint:
+            if 'tracker' in checkpoint:
+                tracker.load_state(checkpoint['tracker'])
+            else:
+                tracker.next_id = checkpoint.get('next_track_id', 1)
+        
+        # Frame results are streamed to disk instead of held in memory
+        writer = JsonlResultWriter(
+            results_path,
+            fsync_interval=self.config['processing'].get('results', {}).get('fsync_interval', 100),
+            checkpoint_path=checkpoint_path,
+            checkpoint_context=checkpoint_context,
+            resume_from=checkpoint
+        )
+        start_frame = 0
+        if checkpoint:
+            if checkpoint['last_frame_number'] is not None:
+                start_frame = checkpoint['last_frame_number'] + 1
+            writer.write_resume(start_frame)
+            results['video_info']['resumed_from_frame'] = start_frame
+            self.logger.info(f"Resuming from frame {start_frame} ({checkpoint['frames_written']} frames already written)")
+        else:
+            writer.write_header(results['video_info'], results['processing_info'])
+        results['results_path'] = str(results_path)
+        completed = False
+        
+        annotated = None
+        if self.annotate:
+            annotated_path = output_base / f"{video_name}_annotated.mp4"
+            annotated = AnnotatedVideoWriter(
+                annotated_path,
+                fps=sampler.describe()['target_fps'] or 30.0,
+                frame_size=cap.frame_size,
+                overlay_config=self.config['processing']['overlay']
+            )
+            results['annotated_video_path'] = str(annotated_path)
+        
+        self.stats_sampler.start()
         try:
-            frame_number = 0
-            while cap.isOpened():
-                ret, frame = cap.read()
-                if not ret:
-                    break
-                
-                frame_result = self.process_frame(frame, frame_number)
-                if frame_result:
-                    results['frame_results'].append(frame_result)
-                
-                frame_number += 1
-                
-                if frame_number % 100 == 0:
-                    self.logger.info(f"Processed {frame_number}/{frame_count} frames")
+            self.logger.info(f"Frame sampling: {sampler.describe()}")
+            self.scene_filter.reset()
+            frames = self.scene_filter.tag(sampler.frames(cap, start_frame=start_frame))
+            
+            if pipeline:
+                self.logger.info(
+                    f"Running pipelined inference with {pipeline.num_workers} workers, "
+                    f"batch size {self.batch_size}"
+                )
+                frame_results = pipeline.run(frames)
+            else:
+                frame_results = self.process_frames(frames)
+            
+            processed = 0
+            # Frame number and predictions of the latest inferred frame
+            last_inferred = None
+            # closing() stops the pipeline threads before the capture is released
+            with closing(frame_results):
+                for frame_number, frame_result in frame_results:
+                    if frame_result and 'reused_from' in frame_result:
+                        if last_inferred and last_inferred[0] == frame_result['reused_from']:
+                            frame_result['predictions'] = last_inferred[1]
+                        else:
+                            # The reference frame failed, so there is nothing to reuse
+                            frame_result = None
+                    elif frame_result:
+                        last_inferred = (frame_number, frame_result['predictions'])
+                    
+                    if frame_result and tracker:
+                        frame_result['predictions'], gaps = tracker.update(
+                            frame_number, frame_result['predictions']
+                        )
+                        checkpoint_context['tracker'] = tracker.state()
+                        # Skipped frames get the tracked boxes, written in frame order. They
+                        # are only checkpointed together with the inferred frame below, so a
+                        # resume never starts between them with a mismatched tracker.
+                        for gap_frame, predictions in (gaps.items() if interpolate else ()):
+                            writer.write_frame({
+                                'frame_number': gap_frame,
+                                'timestamp': frame_result['timestamp'],
+                                'predictions': predictions,
+                                'interpolated': True,
+                                'system_stats': frame_result['system_stats']
+                            }, sync=False)
+                    
+                    if frame_result:
+                        frame = frame_result.pop('frame', None)
+                        writer.write_frame(frame_result)
+                        if annotated and frame is not None:
+                            annotated.write(frame, frame_result)
+                    
+                    processed += 1
+                    if processed % 100 == 0:
+                        self.logger.info(f"Processed {frame_number + 1}/{frame_count} frames")
+            
+            completed = True
                 
         except Exception as e:
             self.logger.error(f"Error during video processing: {str(e)}")
@@ -198,27 +491,64 @@ class VideoProcessor:
         
         finally:
             cap.release()
+            self.stats_sampler.stop()
+            if annotated:
+                annotated.close()
             results['video_info']['end_time'] = datetime.now().isoformat()
+            results['frames_written'] = writer.frames_written
+            footer = {'end_time': results['video_info']['end_time']}
+            if self.scene_filter.enabled:
+                footer['scene_filter'] = {
+                    'frames_inferred': self.scene_filter.inferred,
+                    'frames_reused': self.scene_filter.reused
+                }
+                self.logger.info(
+                    f"Scene filter reused predictions for {self.scene_filter.reused} of "
+                    f"{self.scene_filter.inferred + self.scene_filter.reused} frames"
+                )
+            if tracker:
+                footer['tracking'] = {'unique_counts': tracker.unique_counts}
+            writer.write_footer(**footer)
+            writer.close()
+            # Keep the checkpoint after a failure so the run can be resumed
+            if completed:
+                writer.remove_checkpoint()
             
-            # Save results
-            output_base = Path(self.config['video']['output_path'])
-            video_name = Path(video_path).stem
-            
+            # Single-document JSON is rebuilt from the JSONL stream on request
             if 'json' in self.config['processing']['export_format']:
-                with open(output_base / f"{video_name}_results.json", 'w') as f:
-                    json.dump(results, f, indent=2)
+                jsonl_to_json(results_path, output_base / f"{video_name}_results.json")
             
             self.logger.info("Processing complete")
-            return results
+        
+        return results
+
+def _process_video_task(config_path: str, video_path: str, resume: bool) -> str:
+    """Process one video in a worker process and report its status."""
+    try:
+        VideoProcessor(config_path).process_video(video_path, resume=resume)
+        return 'processed'
+    except Exception as e:
+        logging.getLogger(__name__).error(f"Failed to process {video_path}: {str(e)}")
+        return f"failed: {str(e)}"
 
 def main():
     parser = argparse.ArgumentParser(description="Process video file with ML model")
     parser.add_argument('--config', required=True, help='Path to config file')
-    parser.add_argument('--video', required=True, help='Path to video file')
+    parser.add_argument('--video', help='Path to video file (default: all video.input_paths from the config)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run from its last checkpoint')
+    parser.add_argument('--workers', type=int,
+                        help='Videos processed in parallel in batch mode (default: video.workers)')
     args = parser.parse_args()
     
     processor = VideoProcessor(args.config)
-    processor.process_video(args.video)
+    if args.video:
+        processor.process_video(args.video, resume=args.resume)
+    else:
+        status = processor.process_videos(resume=args.resume, workers=args.workers)
+        failed = [path for path, state in status.items() if state.startswith('failed')]
+        if failed:
+            raise SystemExit(f"{len(failed)} of {len(status)} videos failed")
 
 if __name__ == "__main__":
     main()
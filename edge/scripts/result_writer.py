@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s*')
+
+
+def _dumps(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(',', ':'))
+
+
+def load_checkpoint(checkpoint_path: str) -> Optional[Dict[str, Any]]:
+    """Load a results checkpoint, or None if there is no usable one."""
+    try:
+        with open(checkpoint_path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+    except json.JSONDecodeError as e:
+        logger.warning(f"Ignoring unreadable checkpoint {checkpoint_path}: {str(e)}")
+        return None
+
+
+class JsonlResultWriter:
+    """Append frame results to a JSONL file as they are produced.
+
+    The file starts with a ``header`` record holding ``video_info`` and
+    ``processing_info``, continues with one compact ``frame`` record per
+    frame and ends with a ``footer`` record. The file is fsynced every
+    ``fsync_interval`` frames so a crash loses at most that many records.
+
+    Frame results whose ``system_stats`` carry a ``sample_id`` (see
+    ``SystemStatsSampler``) store only a ``stats_id``; each sample is written
+    once as a ``system_stats`` record before the first frame that uses it.
+
+    With ``checkpoint_path`` every sync also records the file offset and
+    last frame number. Passing that checkpoint back as ``resume_from``
+    truncates anything written after it and continues appending.
+    """
+
+    def __init__(self, path: str, fsync_interval: int = 100,
+                 checkpoint_path: Optional[str] = None,
+                 checkpoint_context: Optional[Dict[str, Any]] = None,
+                 resume_from: Optional[Dict[str, Any]] = None):
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.checkpoint_path = Path(checkpoint_path) if checkpoint_path else None
+        self.checkpoint_context = checkpoint_context or {}
+        self.frames_written = 0
+        self.last_frame_number = None
+        self._written_stats = set()
+        self._unsynced = 0
+
+        if resume_from:
+            self._file = open(self.path, 'r+')
+            self._file.truncate(resume_from['offset'])
+            self._file.seek(resume_from['offset'])
+            self.frames_written = resume_from['frames_written']
+            self.last_frame_number = resume_from['last_frame_number']
+        else:
+            self._file = open(self.path, 'w')
+
+    def __enter__(self) -> 'JsonlResultWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        self._file.write(_dumps(record))
+        self._file.write('\n')
+
+    def write_header(self, video_info: Dict[str, Any], processing_info: Dict[str, Any]) -> None:
+        """Write the header record describing the video and run settings."""
+        self._write({'record': 'header', 'video_info': video_info, 'processing_info': processing_info})
+        self.sync()
+
+    def write_resume(self, frame_number: int) -> None:
+        """Mark where a resumed run picked up; readers skip this record."""
+        self._write({'record': 'resume', 'frame_number': frame_number, 'time': datetime.now().isoformat()})
+
+    def write_frame(self, frame_result: Dict[str, Any], sync: bool = True) -> None:
+        """Append a single frame result.
+
+        With ``sync=False`` the due sync is deferred to the next frame written
+        with ``sync=True``, so no checkpoint lands inside a group of records
+        that must be resumed together.
+        """
+        record = {'record': 'frame', **frame_result}
+        stats = record.get('system_stats')
+        if stats is not None and 'sample_id' in stats:
+            sample_id = stats['sample_id']
+            if sample_id not in self._written_stats:
+                self._write({'record': 'system_stats', **stats})
+                self._written_stats.add(sample_id)
+            del record['system_stats']
+            record['stats_id'] = sample_id
+        self._write(record)
+        self.frames_written += 1
+        self.last_frame_number = frame_result['frame_number']
+        self._unsynced += 1
+        if sync and self.fsync_interval and self._unsynced >= self.fsync_interval:
+            self.sync()
+
+    def write_footer(self, **fields: Any) -> None:
+        """Write the footer record, e.g. the run's end time."""
+        self._write({'record': 'footer', 'frames_written': self.frames_written, **fields})
+        # Not checkpointed: a resumed run must truncate the footer away
+        self._fsync()
+
+    def _fsync(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def sync(self) -> None:
+        """Flush buffered records, fsync them and update the checkpoint."""
+        self._fsync()
+        self._unsynced = 0
+        if self.checkpoint_path is None:
+            return
+        checkpoint = {
+            **self.checkpoint_context,
+            'results_path': str(self.path),
+            'offset': self._file.tell(),
+            'frames_written': self.frames_written,
+            'last_frame_number': self.last_frame_number,
+            'updated_at': datetime.now().isoformat()
+        }
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + '.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+
+    def remove_checkpoint(self) -> None:
+        """Drop the checkpoint once the run has completed."""
+        if self.checkpoint_path is not None and self.checkpoint_path.exists():
+            self.checkpoint_path.unlink()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._fsync()
+            self._file.close()
+
+
+class JsonlResults:
+    """Read a JSONL results file as a header, a frame stream and a footer.
+
+    Iterating yields frame results one at a time, re-reading the file on
+    every pass, so memory use does not depend on the number of frames.
+    Frames that reference a shared stats sample get it back as
+    ``system_stats``. A truncated last line, as left by a crashed run, is
+    ignored.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._header: Optional[Dict[str, Any]] = None
+        self._footer: Dict[str, Any] = {}
+        self._frame_count = 0
+
+    def _records(self) -> Iterator[Dict[str, Any]]:
+        with open(self.path) as f:
+            for line_number, line in enumerate(f, 1):
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"Ignoring truncated record at {self.path}:{line_number}")
+                    return
+
+    def _scan(self) -> None:
+        if self._header is not None:
+            return
+        self._header = {}
+        for record in self._records():
+            kind = record.get('record')
+            if kind == 'frame':
+                self._frame_count += 1
+            elif kind == 'header':
+                self._header = record
+            elif kind == 'footer':
+                self._footer = record
+
+    @property
+    def header(self) -> Dict[str, Any]:
+        self._scan()
+        return self._header
+
+    @property
+    def footer(self) -> Dict[str, Any]:
+        self._scan()
+        return self._footer
+
+    def __len__(self) -> int:
+        self._scan()
+        return self._frame_count
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        # One sample per stats interval, so this stays small
+        stats_samples = {}
+        for record in self._records():
+            kind = record.pop('record', None)
+            if kind == 'frame':
+                if 'stats_id' in record:
+                    record['system_stats'] = stats_samples.get(record.pop('stats_id'), {})
+                yield record
+            elif kind == 'system_stats':
+                stats_samples[record['sample_id']] = record
+
+    @property
+    def video_info(self) -> Dict[str, Any]:
+        video_info = dict(self.header.get('video_info', {}))
+        if 'end_time' in self.footer:
+            video_info['end_time'] = self.footer['end_time']
+        return video_info
+
+    @property
+    def processing_info(self) -> Dict[str, Any]:
+        return self.header.get('processing_info', {})
+
+    def to_results(self) -> Dict[str, Any]:
+        """Results dict in the ``{video}_results.json`` layout, with frames streamed."""
+        return {
+            'video_info': self.video_info,
+            'processing_info': self.processing_info,
+            'frame_results': self
+        }
+
+
+class _JsonStream:
+    """Decode JSON values one at a time from a file read in chunks."""
+
+    def __init__(self, f: TextIO, chunk_size: int):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _read(self) -> None:
+        data = self.f.read(self.chunk_size)
+        if not data:
+            self.eof = True
+        # Drop what has been consumed so the buffer stays about one chunk long
+        self.buffer = self.buffer[self.pos:] + data
+        self.pos = 0
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at the end of the file."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if self.eof:
+                return ''
+            self._read()
+
+    def expect(self, chars: str) -> str:
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"Expected one of {chars!r} in {self.f.name}, found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A number at the end of the buffer may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._read()
+
+    def array(self) -> Iterator[Any]:
+        self.expect('[')
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+
+class JsonResults:
+    """Read a single-document JSON results file without loading it whole.
+
+    The top-level object is parsed key by key and ``frame_results`` is
+    decoded one frame at a time, so iterating frames uses memory for one
+    read chunk and one frame. ``video_info`` and ``processing_info`` come
+    before the frames in files written by ``jsonl_to_json``; otherwise
+    finding them costs an extra pass over the frames.
+    """
+
+    CHUNK_SIZE = 1 << 16
+
+    def __init__(self, path: str, chunk_size: int = CHUNK_SIZE):
+        self.path = Path(path)
+        self.chunk_size = chunk_size
+        self._info: Optional[Dict[str, Any]] = None
+
+    def _items(self) -> Iterator[Tuple[str, Any]]:
+        """Yield top-level (key, value) pairs, with frame_results as a frame iterator."""
+        with open(self.path) as f:
+            stream = _JsonStream(f, self.chunk_size)
+            stream.expect('{')
+            if stream.peek() == '}':
+                return
+            while True:
+                key = stream.value()
+                stream.expect(':')
+                if key == 'frame_results':
+                    frames = stream.array()
+                    yield key, frames
+                    # Skip whatever the caller did not consume
+                    for _ in frames:
+                        pass
+                else:
+                    yield key, stream.value()
+                if stream.expect(',}') == '}':
+                    return
+
+    def _scan(self) -> Dict[str, Any]:
+        if self._info is None:
+            self._info = {}
+            for key, value in self._items():
+                if key == 'frame_results':
+                    if 'video_info' in self._info and 'processing_info' in self._info:
+                        break
+                else:
+                    self._info[key] = value
+        return self._info
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for key, value in self._items():
+            if key == 'frame_results':
+                yield from value
+                return
+
+    @property
+    def video_info(self) -> Dict[str, Any]:
+        return self._scan().get('video_info', {})
+
+    @property
+    def processing_info(self) -> Dict[str, Any]:
+        return self._scan().get('processing_info', {})
+
+    def to_results(self) -> Dict[str, Any]:
+        """Results dict in the ``{video}_results.json`` layout, with frames streamed."""
+        return {
+            'video_info': self.video_info,
+            'processing_info': self.processing_info,
+            'frame_results': self
+        }
+
+
+def read_footer(jsonl_path: str) -> Optional[Dict[str, Any]]:
+    """Return the footer record if it is the last line of the file.
+
+    Only the tail of the file is read, so this is cheap for large results.
+    """
+    try:
+        with open(jsonl_path, 'rb') as f:
+            f.seek(0, os.SEEK_END)
+            f.seek(max(0, f.tell() - 4096))
+            lines = f.read().splitlines()
+    except FileNotFoundError:
+        return None
+    if not lines:
+        return None
+    try:
+        record = json.loads(lines[-1])
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if record.get('record') == 'footer' else None
+
+
+def jsonl_to_json(jsonl_path: str, json_path: str) -> None:
+    """Convert a JSONL results file to the single-document JSON layout.
+
+    Frames are copied one at a time rather than loaded into a list.
+    """
+    results = JsonlResults(jsonl_path)
+    with open(json_path, 'w') as f:
+        f.write('{"video_info":')
+        f.write(_dumps(results.video_info))
+        f.write(',"processing_info":')
+        f.write(_dumps(results.processing_info))
+        f.write(',"frame_results":[')
+        for i, frame_result in enumerate(results):
+            if i:
+                f.write(',')
+            f.write('\n')
+            f.write(_dumps(frame_result))
+        f.write('\n]}\n')
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import threading
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class SceneChangeFilter:
+    """Skip inference on frames that barely differ from the last inferred one.
+
+    Each frame is reduced to a small grayscale thumbnail and compared with
+    the thumbnail of the last frame sent to inference, either by mean
+    absolute pixel difference (``diff``) or by the distance between their
+    intensity histograms (``histogram``). Both scores lie in [0, 1]; frames
+    scoring below ``threshold`` reuse the reference frame's predictions.
+    ``max_reuse`` forces a fresh inference after that many reused frames.
+
+    Decisions are made in decode order by ``tag()``, so they do not depend
+    on how pipeline workers interleave.
+    """
+
+    METHODS = ('diff', 'histogram')
+
+    def __init__(self, threshold: float = 0.02, method: str = 'diff',
+                 thumbnail_width: int = 64, max_reuse: int = 10, enabled: bool = True):
+        if method not in self.METHODS:
+            raise ValueError(f"Unknown scene filter method: {method}")
+        self.threshold = threshold
+        self.method = method
+        self.thumbnail_width = thumbnail_width
+        self.max_reuse = max_reuse
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self.reset()
+
+    @classmethod
+    def from_config(cls, processing_config: Dict[str, Any]) -> 'SceneChangeFilter':
+        """Build a filter from the ``processing`` config section."""
+        config = processing_config.get('scene_filter', {})
+        return cls(
+            threshold=config.get('threshold', 0.02),
+            method=config.get('method', 'diff'),
+            thumbnail_width=config.get('thumbnail_width', 64),
+            max_reuse=config.get('max_reuse', 10),
+            enabled=config.get('enabled', False)
+        )
+
+    def reset(self) -> None:
+        """Forget the reference frame, e.g. before a new video."""
+        self._reference: Optional[np.ndarray] = None
+        self._reference_number: Optional[int] = None
+        self._reused_in_row = 0
+        self._reuse: Dict[int, int] = {}
+        self.inferred = 0
+        self.reused = 0
+
+    def describe(self) -> Dict[str, Any]:
+        """Summary of the filter settings for ``processing_info``."""
+        if not self.enabled:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'method': self.method,
+            'threshold': self.threshold,
+            'max_reuse': self.max_reuse
+        }
+
+    def thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled grayscale copy of a frame used for comparisons."""
+        h, w = frame.shape[:2]
+        size = (self.thumbnail_width, max(1, round(self.thumbnail_width * h / w)))
+        small = cv2.resize(frame, size, interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small
+
+    def distance(self, a: np.ndarray, b: np.ndarray) -> float:
+        """Difference between two thumbnails in [0, 1]."""
+        if self.method == 'histogram':
+            hist_a = np.bincount(a.ravel() >> 3, minlength=32) / a.size
+            hist_b = np.bincount(b.ravel() >> 3, minlength=32) / b.size
+            return float(np.abs(hist_a - hist_b).sum() / 2)
+        return float(np.abs(a.astype(np.int16) - b).mean() / 255)
+
+    def tag(self, frames: Iterator[Tuple[int, np.ndarray]]) -> Iterator[Tuple[int, np.ndarray]]:
+        """Pass frames through, recording which ones can reuse predictions."""
+        for frame_number, frame in frames:
+            if self.enabled:
+                self._decide(frame_number, frame)
+            yield frame_number, frame
+
+    def _decide(self, frame_number: int, frame: np.ndarray) -> None:
+        thumbnail = self.thumbnail(frame)
+        if (self._reference is not None
+                and self._reused_in_row < self.max_reuse
+                and self.distance(thumbnail, self._reference) < self.threshold):
+            with self._lock:
+                self._reuse[frame_number] = self._reference_number
+            self._reused_in_row += 1
+            self.reused += 1
+            return
+        self._reference = thumbnail
+        self._reference_number = frame_number
+        self._reused_in_row = 0
+        self.inferred += 1
+
+    def reference_for(self, frame_number: int) -> Optional[int]:
+        """Frame whose predictions this frame reuses, or None to run inference."""
+        with self._lock:
+            return self._reuse.pop(frame_number, None)
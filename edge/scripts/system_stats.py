@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+
+import itertools
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import psutil
+
+
+class SystemStatsSampler:
+    """Refresh a shared system stats snapshot from a background thread.
+
+    ``latest()`` returns the current snapshot without any syscalls, so
+    per-frame code can attach it cheaply. Snapshots are replaced, never
+    mutated, and carry a ``sample_id`` that lets result writers store each
+    sample once and reference it from frame records.
+    """
+
+    def __init__(self, interval: float = 1.0, timestamp_format: str = "%Y-%m-%d %H:%M:%S"):
+        self.interval = interval
+        self.timestamp_format = timestamp_format
+        self.logger = logging.getLogger(__name__)
+        self._ids = itertools.count()
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'SystemStatsSampler':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.stop()
+
+    def sample(self) -> Dict[str, Any]:
+        """Take a fresh sample and publish it as the latest snapshot."""
+        memory = psutil.virtual_memory()
+        self._snapshot = {
+            'sample_id': next(self._ids),
+            'timestamp': datetime.now().strftime(self.timestamp_format),
+            'cpu_percent': psutil.cpu_percent(),
+            'memory_percent': memory.percent,
+            'available_memory_gb': memory.available / (1024**3)
+        }
+        return self._snapshot
+
+    def latest(self) -> Dict[str, Any]:
+        """Most recent snapshot; treat it as read-only."""
+        return self._snapshot or self.sample()
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self.sample()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='system-stats', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join(timeout=self.interval + 1.0)
+        self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.sample()
+            except Exception as e:
+                self.logger.warning(f"System stats sampling failed: {str(e)}")
@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+BOX_FIELDS = ('x', 'y', 'width', 'height')
+
+
+def iou_matrix(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU of two sets of (cx, cy, w, h) boxes."""
+    a_min, a_max = a[:, None, :2] - a[:, None, 2:] / 2, a[:, None, :2] + a[:, None, 2:] / 2
+    b_min, b_max = b[None, :, :2] - b[None, :, 2:] / 2, b[None, :, :2] + b[None, :, 2:] / 2
+    overlap = np.clip(np.minimum(a_max, b_max) - np.maximum(a_min, b_min), 0, None)
+    intersection = overlap[..., 0] * overlap[..., 1]
+    area_a = a[:, 2] * a[:, 3]
+    area_b = b[:, 2] * b[:, 3]
+    union = area_a[:, None] + area_b[None, :] - intersection
+    return np.divide(intersection, union, out=np.zeros_like(intersection), where=union > 0)
+
+
+class _Track:
+    __slots__ = ('track_id', 'class_name', 'box', 'velocity', 'confidence', 'last_frame', 'hits', 'misses')
+
+    def __init__(self, box: np.ndarray, class_name: str, confidence: float, frame_number: int):
+        self.track_id: Optional[int] = None
+        self.class_name = class_name
+        self.box = box
+        self.velocity = np.zeros(4)
+        self.confidence = confidence
+        self.last_frame = frame_number
+        self.hits = 1
+        self.misses = 0
+
+    def predict(self, frame_number: int) -> np.ndarray:
+        return self.box + self.velocity * (frame_number - self.last_frame)
+
+
+class IoUTracker:
+    """SORT-style tracker over the predictions of sampled frames.
+
+    Each track moves with a constant per-frame velocity. Detections are
+    matched to the tracks' predicted boxes greedily by IoU, only within the
+    same class. A track gets a ``track_id`` once it has been matched in
+    ``min_hits`` inferred frames, and is dropped after ``max_age``
+    consecutive inferred frames without a match.
+
+    ``update`` also returns linearly interpolated boxes of confirmed tracks
+    for the frames between the previous update and this one, i.e. the frames
+    that sampling skipped.
+    """
+
+    def __init__(self, iou_threshold: float = 0.3, max_age: int = 3, min_hits: int = 2,
+                 next_id: int = 1):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.min_hits = min_hits
+        self.next_id = next_id
+        self.tracks: List[_Track] = []
+        self.unique_counts: Dict[str, int] = {}
+        self._last_update: Optional[int] = None
+
+    @classmethod
+    def from_config(cls, processing_config: Dict[str, Any]) -> Optional['IoUTracker']:
+        """Build a tracker from the ``processing`` config section, or None if disabled."""
+        config = processing_config.get('tracking', {})
+        if not config.get('enabled', False):
+            return None
+        return cls(
+            iou_threshold=config.get('iou_threshold', 0.3),
+            max_age=config.get('max_age', 3),
+            min_hits=config.get('min_hits', 2)
+        )
+
+    def state(self) -> Dict[str, Any]:
+        """JSON-serializable tracker state for a results checkpoint."""
+        return {
+            'next_id': self.next_id,
+            'unique_counts': dict(self.unique_counts),
+            'last_update': self._last_update,
+            'tracks': [{
+                'track_id': track.track_id,
+                'class_name': track.class_name,
+                'box': track.box.tolist(),
+                'velocity': track.velocity.tolist(),
+                'confidence': track.confidence,
+                'last_frame': track.last_frame,
+                'hits': track.hits,
+                'misses': track.misses
+            } for track in self.tracks]
+        }
+
+    def load_state(self, state: Dict[str, Any]) -> None:
+        """Restore the state saved by ``state``, e.g. when resuming a run."""
+        self.next_id = state['next_id']
+        self.unique_counts = dict(state['unique_counts'])
+        self._last_update = state['last_update']
+        self.tracks = []
+        for saved in state['tracks']:
+            track = _Track(np.array(saved['box'], dtype=float), saved['class_name'],
+                           saved['confidence'], saved['last_frame'])
+            track.track_id = saved['track_id']
+            track.velocity = np.array(saved['velocity'], dtype=float)
+            track.hits = saved['hits']
+            track.misses = saved['misses']
+            self.tracks.append(track)
+
+    def _match(self, boxes: np.ndarray, classes: List[str],
+               frame_number: int) -> List[Tuple[int, int]]:
+        if not self.tracks or not len(boxes):
+            return []
+        predicted = np.stack([track.predict(frame_number) for track in self.tracks])
+        iou = iou_matrix(predicted, boxes)
+        track_classes = np.array([track.class_name for track in self.tracks], dtype=object)
+        iou[track_classes[:, None] != np.array(classes, dtype=object)[None, :]] = 0.0
+
+        matches = []
+        used_tracks, used_detections = set(), set()
+        for flat in np.argsort(iou, axis=None)[::-1]:
+            t, d = divmod(int(flat), iou.shape[1])
+            if iou[t, d] < self.iou_threshold:
+                break
+            if t in used_tracks or d in used_detections:
+                continue
+            matches.append((t, d))
+            used_tracks.add(t)
+            used_detections.add(d)
+        return matches
+
+    def update(self, frame_number: int, predictions: List[Dict[str, Any]]
+               ) -> Tuple[List[Dict[str, Any]], Dict[int, List[Dict[str, Any]]]]:
+        """Match one inferred frame's predictions to the tracks.
+
+        Returns copies of the predictions, with ``track_id`` set for those
+        on confirmed tracks, and interpolated predictions keyed by frame
+        number for the skipped frames since the previous update.
+        """
+        previous_update = self._last_update
+        self._last_update = frame_number
+        boxes = np.array([[pred.get(field, 0.0) for field in BOX_FIELDS] for pred in predictions],
+                         dtype=float).reshape(-1, 4)
+        classes = [pred.get('class', 'unknown') for pred in predictions]
+
+        tracked = [dict(pred) for pred in predictions]
+        interpolated: Dict[int, List[Dict[str, Any]]] = {}
+        matches = self._match(boxes, classes, frame_number)
+
+        for t, d in matches:
+            track = self.tracks[t]
+            start_box, start_frame, start_confidence = track.box, track.last_frame, track.confidence
+            gap = frame_number - start_frame
+            if gap > 0:
+                track.velocity = (boxes[d] - start_box) / gap
+            track.box = boxes[d]
+            track.confidence = predictions[d].get('confidence', 0.0)
+            track.last_frame = frame_number
+            track.hits += 1
+            track.misses = 0
+            if track.track_id is None and track.hits >= self.min_hits:
+                track.track_id = self.next_id
+                self.next_id += 1
+                self.unique_counts[track.class_name] = self.unique_counts.get(track.class_name, 0) + 1
+            if track.track_id is None:
+                continue
+            tracked[d]['track_id'] = track.track_id
+
+            # Frames before the previous update were already emitted
+            first = start_frame if previous_update is None else max(start_frame, previous_update)
+            for gap_frame in range(first + 1, frame_number):
+                weight = (gap_frame - start_frame) / gap
+                box = start_box + (track.box - start_box) * weight
+                interpolated.setdefault(gap_frame, []).append({
+                    **dict(zip(BOX_FIELDS, box.tolist())),
+                    'confidence': start_confidence + (track.confidence - start_confidence) * weight,
+                    'class': track.class_name,
+                    'track_id': track.track_id
+                })
+
+        matched_tracks = {t for t, _ in matches}
+        matched_detections = {d for _, d in matches}
+        survivors = []
+        for t, track in enumerate(self.tracks):
+            if t not in matched_tracks:
+                track.misses += 1
+            if track.misses <= self.max_age:
+                survivors.append(track)
+        for d in range(len(predictions)):
+            if d not in matched_detections:
+                survivors.append(_Track(
+                    boxes[d], classes[d], predictions[d].get('confidence', 0.0), frame_number))
+        self.tracks = survivors
+
+        return tracked, dict(sorted(interpolated.items()))
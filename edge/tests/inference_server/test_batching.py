@@ -0,0 +1,78 @@
+import unittest
+import sys
+import os
+import asyncio
+import time
+
+import numpy as np
+
+# Add inference server directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "docker", "inference"))
+from batching import MicroBatcher
+
+class TestMicroBatcher(unittest.TestCase):
+    def _run(self, batcher, coro_fn):
+        async def main():
+            batcher.start()
+            try:
+                return await coro_fn()
+            finally:
+                await batcher.stop()
+        return asyncio.run(main())
+
+    def test_concurrent_requests_are_batched(self):
+        """Requests arriving together share one model call and keep their own results."""
+        calls = []
+
+        def infer_batch(images, model_id):
+            calls.append(len(images))
+            time.sleep(0.05)
+            return [{'value': int(image[0, 0])} for image in images]
+
+        batcher = MicroBatcher(infer_batch, max_batch_size=8, max_wait=0.05, workers=1)
+
+        async def requests():
+            images = [np.full((2, 2), i, dtype=np.uint8) for i in range(20)]
+            return await asyncio.gather(*(batcher.submit(image, 'model') for image in images))
+
+        results = self._run(batcher, requests)
+        self.assertEqual([r['value'] for r in results], list(range(20)))
+        self.assertLess(len(calls), 20)
+        self.assertLessEqual(max(calls), 8)
+
+    def test_event_loop_stays_responsive(self):
+        """Blocking inference does not stall other coroutines."""
+        def infer_batch(images, model_id):
+            time.sleep(0.3)
+            return [{} for _ in images]
+
+        batcher = MicroBatcher(infer_batch, workers=1)
+
+        async def requests():
+            pending = asyncio.ensure_future(batcher.submit(np.zeros((2, 2)), 'model'))
+            start = time.monotonic()
+            await asyncio.sleep(0.01)
+            latency = time.monotonic() - start
+            await pending
+            return latency
+
+        self.assertLess(self._run(batcher, requests), 0.1)
+
+    def test_errors_reach_every_caller(self):
+        """A failed batch raises in each waiting request."""
+        def infer_batch(images, model_id):
+            raise ValueError("model unavailable")
+
+        batcher = MicroBatcher(infer_batch, max_wait=0.02)
+
+        async def requests():
+            return await asyncio.gather(
+                *(batcher.submit(np.zeros((2, 2)), 'model') for _ in range(3)),
+                return_exceptions=True
+            )
+
+        results = self._run(batcher, requests)
+        self.assertTrue(all(isinstance(r, ValueError) for r in results))
+
+if __name__ == '__main__':
+    unittest.main()
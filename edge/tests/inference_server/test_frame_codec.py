@@ -0,0 +1,88 @@
+import os
+import sys
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "docker", "inference"))
+
+from frame_codec import BatchUploadClient, pack_frames, parse_shape, raw_frame, unpack_frames
+
+
+def decode_image(contents):
+    return cv2.imdecode(np.frombuffer(contents, np.uint8), cv2.IMREAD_COLOR)
+
+
+class TestFrameCodec(unittest.TestCase):
+    def test_raw_frame(self):
+        frame = np.arange(4 * 5 * 3, dtype=np.uint8).reshape(4, 5, 3)
+        shape = parse_shape("4,5,3")
+        np.testing.assert_array_equal(raw_frame(frame.tobytes(), shape), frame)
+
+    def test_raw_frame_rejects_bad_input(self):
+        with self.assertRaises(ValueError):
+            parse_shape(None)
+        with self.assertRaises(ValueError):
+            parse_shape("4")
+        with self.assertRaises(ValueError):
+            raw_frame(b"\x00" * 10, (4, 5, 3))
+
+    def test_pack_round_trip_raw_and_encoded(self):
+        color = np.random.randint(0, 255, (6, 8, 3), dtype=np.uint8)
+        gray = np.random.randint(0, 255, (6, 8), dtype=np.uint8)
+        encoded = np.full((6, 8, 3), 200, dtype=np.uint8)
+        _, png = cv2.imencode('.png', encoded)
+
+        frames = unpack_frames(pack_frames([color, png.tobytes(), gray]), decode_image)
+
+        self.assertEqual(len(frames), 3)
+        np.testing.assert_array_equal(frames[0], color)
+        np.testing.assert_array_equal(frames[1], encoded)
+        np.testing.assert_array_equal(frames[2], gray)
+
+    def test_truncated_payload(self):
+        payload = pack_frames([np.zeros((4, 4, 3), dtype=np.uint8)])
+        with self.assertRaises(ValueError):
+            unpack_frames(payload[:-1], decode_image)
+        with self.assertRaises(ValueError):
+            unpack_frames(b"JUNK" + payload[4:], decode_image)
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class TestBatchUploadClient(unittest.TestCase):
+    def test_batch_is_one_multipart_request(self):
+        requests = []
+
+        class Session:
+            def post(self, url, params, files):
+                requests.append((url, params, files))
+                return FakeResponse({'results': [{'shape': list(decode_image(f[1][1]).shape)} for f in files]})
+
+        client = BatchUploadClient("http://localhost:9001/")
+        client._local.session = Session()
+        frames = [np.full((6, 8, 3), i * 40, dtype=np.uint8) for i in range(3)]
+
+        results = client.infer(frames, model_id="fish/2")
+
+        self.assertEqual(len(requests), 1)
+        url, params, files = requests[0]
+        self.assertEqual(url, "http://localhost:9001/predict_batch")
+        self.assertEqual(params, {'model_id': "fish/2"})
+        self.assertEqual([name for name, _ in files], ['files'] * 3)
+        self.assertEqual(results, [{'shape': [6, 8, 3]}] * 3)
+        self.assertEqual(client.infer(frames[0], model_id="fish/2"), {'shape': [6, 8, 3]})
+
+
+if __name__ == '__main__':
+    unittest.main()
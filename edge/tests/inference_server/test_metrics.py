@@ -0,0 +1,59 @@
+import os
+import sys
+import unittest
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "docker", "inference"))
+
+from metrics import Counter, Gauge, Histogram, Registry, bounded_label
+
+
+class TestMetrics(unittest.TestCase):
+    def test_counter_renders_labels(self):
+        counter = Counter("requests_total", "Requests", ["endpoint"])
+        counter.inc("/predict")
+        counter.inc("/predict", amount=2)
+        self.assertEqual(counter.value("/predict"), 3)
+        self.assertIn('requests_total{endpoint="/predict"} 3.0', counter.render())
+
+    def test_gauge_callback(self):
+        gauge = Gauge("queue_depth", "Depth", callback=lambda: 7)
+        self.assertEqual(gauge.value(), 7.0)
+
+    def test_histogram_buckets_are_cumulative(self):
+        histogram = Histogram("latency", "Latency", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 5.0):
+            histogram.observe(value)
+        lines = histogram.render()
+        self.assertIn('latency_bucket{le="0.1"} 1', lines)
+        self.assertIn('latency_bucket{le="1.0"} 2', lines)
+        self.assertIn('latency_bucket{le="+Inf"} 3', lines)
+        self.assertIn('latency_count 3', lines)
+
+    def test_histogram_quantile(self):
+        histogram = Histogram("latency", "Latency", buckets=(0.01, 0.1, 1.0))
+        self.assertIsNone(histogram.quantile(0.5))
+        for _ in range(90):
+            histogram.observe(0.005)
+        for _ in range(10):
+            histogram.observe(0.5)
+        self.assertLessEqual(histogram.quantile(0.5), 0.01)
+        self.assertGreater(histogram.quantile(0.99), 0.1)
+
+    def test_bounded_label(self):
+        allowed = ("/predict", "/predict_batch")
+        self.assertEqual(bounded_label("/predict_batch", allowed), "/predict_batch")
+        self.assertEqual(bounded_label("/predict/../x", allowed), "other")
+        self.assertEqual(bounded_label("/predictx", allowed, other="unknown"), "unknown")
+
+    def test_registry_renders_all_metrics(self):
+        registry = Registry()
+        registry.register(Counter("a_total", "A")).inc()
+        registry.register(Gauge("b", "B")).inc()
+        text = registry.render()
+        self.assertIn("# TYPE a_total counter", text)
+        self.assertIn("# TYPE b gauge", text)
+        self.assertTrue(text.endswith("\n"))
+
+
+if __name__ == '__main__':
+    unittest.main()
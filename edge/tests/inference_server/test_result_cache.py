@@ -0,0 +1,48 @@
+import unittest
+import sys
+import os
+import time
+
+import numpy as np
+
+# Add inference server directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "docker", "inference"))
+from result_cache import ResultCache
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.image = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+
+    def test_hit_and_miss_counters(self):
+        """Identical frames for the same model hit; other models miss."""
+        cache = ResultCache(max_entries=4)
+        key = cache.key('fish/2', self.image)
+        self.assertIsNone(cache.get(key))
+        cache.put(key, {'predictions': []})
+
+        self.assertEqual(cache.get(cache.key('fish/2', self.image.copy())), {'predictions': []})
+        self.assertIsNone(cache.get(cache.key('coral/1', self.image)))
+        self.assertEqual((cache.hits, cache.misses), (1, 2))
+
+    def test_lru_eviction_and_ttl(self):
+        """Entries beyond max_entries or older than ttl are dropped."""
+        cache = ResultCache(max_entries=2, ttl=0.05)
+        for i in range(3):
+            cache.put(('m', str(i)), i)
+        self.assertIsNone(cache.get(('m', '0')))
+        self.assertEqual(cache.get(('m', '2')), 2)
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(('m', '2')))
+        self.assertEqual(cache.stats()['evictions'], 2)
+
+    def test_perceptual_mode_matches_near_identical_frames(self):
+        """Sensor noise does not change the perceptual key; a new scene does."""
+        cache = ResultCache(mode='perceptual')
+        noisy = np.clip(self.image.astype(np.int16) + 1, 0, 255).astype(np.uint8)
+        self.assertEqual(cache.key('m', self.image), cache.key('m', noisy))
+        self.assertNotEqual(cache.key('m', self.image), cache.key('m', self.image[::-1]))
+        self.assertNotEqual(ResultCache().key('m', self.image), ResultCache().key('m', noisy))
+
+if __name__ == '__main__':
+    unittest.main()
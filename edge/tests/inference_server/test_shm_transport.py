@@ -0,0 +1,80 @@
+import os
+import sys
+import threading
+import unittest
+from multiprocessing import shared_memory
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "docker", "inference"))
+
+from shm_transport import SharedFrameReader, ShmInferenceClient
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.body = body
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.body
+
+
+class FakeSession:
+    """Answers /predict_shm by reading the frames back out of shared memory."""
+
+    def __init__(self):
+        self.reader = SharedFrameReader()
+        self.batch_sizes = []
+        self.gate = None
+
+    def post(self, url, json):
+        frames = self.reader.frames(json['frames'])
+        results = [{'mean': float(frame.mean()), 'shape': list(frame.shape)} for frame in frames]
+        self.batch_sizes.append(len(frames))
+        if self.gate is not None and len(self.batch_sizes) == 1:
+            # Hold the first request open until the test releases it
+            self.gate.wait(5)
+        return FakeResponse({'results': results})
+
+
+class TestShmInferenceClient(unittest.TestCase):
+    def setUp(self):
+        self.client = ShmInferenceClient("http://localhost:9001", slots=4)
+        self.session = self.client.session = FakeSession()
+
+    def tearDown(self):
+        self.client.close()
+
+    def test_batch_larger_than_ring_is_split(self):
+        frames = [np.full((4, 4, 3), i, dtype=np.uint8) for i in range(10)]
+
+        results = self.client.infer(frames, model_id="m")
+
+        self.assertEqual([r['mean'] for r in results], list(range(10)))
+        self.assertEqual(self.session.batch_sizes, [4, 4, 2])
+
+    def test_replaced_ring_closes_after_last_request(self):
+        self.session.gate = threading.Event()
+        worker = threading.Thread(target=self.client.infer, args=(np.zeros((4, 4, 3), dtype=np.uint8), "m"))
+        worker.start()
+        while not self.session.batch_sizes:
+            pass
+        old_name = self.client._ring.name
+
+        # A larger frame swaps in a new ring while the first request still holds the old one
+        result = self.client.infer(np.ones((8, 8, 3), dtype=np.uint8), model_id="m")
+        self.assertEqual(result['shape'], [8, 8, 3])
+        self.assertNotEqual(self.client._ring.name, old_name)
+        shared_memory.SharedMemory(name=old_name).close()
+
+        self.session.gate.set()
+        worker.join(5)
+        self.assertFalse(worker.is_alive())
+        with self.assertRaises(FileNotFoundError):
+            shared_memory.SharedMemory(name=old_name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "depth-anything-v3-marine"))
+from batch_pointcloud import convert_frames, find_frame_pairs, write_metadata
+from pointcloud_io import load_ply
+from pointcloud_voxel import VoxelGrid
+
+
+class TestBatchPointCloud(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_dir = os.path.join(self.tmp.name, "turtle_depth_trt")
+        os.makedirs(self.input_dir)
+        rng = np.random.default_rng(0)
+        for i in range(5):
+            base = os.path.join(self.input_dir, f"turtle_frame_{i:06d}")
+            cv2.imwrite(f"{base}_depth.png", rng.integers(0, 256, (48, 64), dtype=np.uint8))
+            if i != 3:
+                cv2.imwrite(f"{base}_original.jpg", rng.integers(0, 256, (48, 64, 3), dtype=np.uint8))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_parallel_matches_serial(self):
+        pairs = find_frame_pairs(self.tmp.name)
+        self.assertEqual([frame for frame, _, _ in pairs],
+                         ["turtle_frame_000000", "turtle_frame_000001", "turtle_frame_000002", "turtle_frame_000004"])
+
+        serial = convert_frames(pairs, os.path.join(self.tmp.name, "serial"), workers=1)
+        parallel = convert_frames(pairs, os.path.join(self.tmp.name, "parallel"), workers=2, chunk_size=1)
+
+        self.assertEqual([r["num_points"] for r in serial], [r["num_points"] for r in parallel])
+        for a, b in zip(serial, parallel):
+            np.testing.assert_array_equal(load_ply(a["ply_file"]), load_ply(b["ply_file"]))
+
+        output_dir = os.path.join(self.tmp.name, "parallel")
+        with open(write_metadata(self.tmp.name, output_dir, parallel, settings={"stride": 4})) as f:
+            metadata = json.load(f)
+        self.assertEqual(metadata["total_frames"], 4)
+        self.assertEqual(metadata["total_points"], sum(r["num_points"] for r in parallel))
+        self.assertEqual(metadata["settings"], {"stride": 4})
+
+    def test_fuse_merges_frames_in_workers(self):
+        pairs = find_frame_pairs(self.tmp.name)
+        serial = VoxelGrid(0.05)
+        convert_frames(pairs, os.path.join(self.tmp.name, "serial"), workers=1, fusion=serial)
+        parallel = VoxelGrid(0.05)
+        results = convert_frames(pairs, os.path.join(self.tmp.name, "parallel"), workers=2, fusion=parallel)
+
+        self.assertNotIn("voxels", results[0])
+        self.assertEqual(os.listdir(os.path.join(self.tmp.name, "parallel")), [])
+        for a, b in zip(serial.to_arrays(), parallel.to_arrays()):
+            np.testing.assert_array_equal(a, b)
+
+
+if __name__ == '__main__':
+    unittest.main()
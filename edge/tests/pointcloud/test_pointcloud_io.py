@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "depth-anything-v3-marine"))
+from pointcloud_io import (VERTEX_DTYPE, load_ply, load_pointcloud, ply_header, save_npy, save_ply,
+                           split_vertices, to_vertices)
+
+
+class TestPointCloudIO(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        self.points = rng.random((100, 3)).astype(np.float32)
+        self.colors = rng.integers(0, 256, (100, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _read(self, path):
+        with open(path, 'rb') as f:
+            data = f.read()
+        header, body = data.split(b"end_header\n", 1)
+        return header.decode('ascii'), body
+
+    def test_binary_body_is_packed_vertices(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        self.assertEqual(save_ply(self.points, self.colors, path), 100)
+
+        header, body = self._read(path)
+        self.assertIn("format binary_little_endian 1.0", header)
+        self.assertIn("element vertex 100", header)
+        self.assertIn("property uchar red", header)
+        self.assertEqual(len(body), 100 * 15)
+        vertices = np.frombuffer(body, dtype=VERTEX_DTYPE)
+        np.testing.assert_array_equal(vertices['y'], self.points[:, 1])
+        np.testing.assert_array_equal(vertices['blue'], self.colors[:, 2])
+
+    def test_ascii_matches_binary(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        save_ply(self.points, self.colors, path, binary=False, precision=3)
+
+        header, body = self._read(path)
+        self.assertIn("format ascii 1.0", header)
+        rows = np.array([line.split() for line in body.decode('ascii').splitlines()], dtype=float)
+        self.assertEqual(rows.shape, (100, 6))
+        np.testing.assert_allclose(rows[:, :3], self.points, atol=5e-4)
+        np.testing.assert_array_equal(rows[:, 3:], self.colors)
+
+    def test_points_without_colors(self):
+        vertices = to_vertices(self.points)
+        self.assertEqual(vertices.dtype.names, ('x', 'y', 'z'))
+        self.assertNotIn("red", ply_header(vertices))
+
+    def test_binary_loads_memory_mapped(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        save_ply(self.points, self.colors, path)
+
+        vertices = load_ply(path)
+        self.assertIsInstance(vertices, np.memmap)
+        self.assertEqual(vertices.dtype, VERTEX_DTYPE)
+        np.testing.assert_array_equal(vertices[10:20]['z'], self.points[10:20, 2])
+        points, colors = split_vertices(load_ply(path, mmap=False))
+        np.testing.assert_array_equal(points, self.points)
+        np.testing.assert_array_equal(colors, self.colors)
+
+    def test_ascii_loads(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        save_ply(self.points, None, path, binary=False)
+
+        points, colors = split_vertices(load_pointcloud(path))
+        self.assertIsNone(colors)
+        np.testing.assert_allclose(points, self.points, atol=1e-6)
+
+    def test_big_endian_and_extra_elements(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        vertices = to_vertices(self.points[:2]).astype([('x', '>f4'), ('y', '>f4'), ('z', '>f4')])
+        with open(path, 'wb') as f:
+            f.write(b"ply\nformat binary_big_endian 1.0\ncomment test\nelement vertex 2\n"
+                    b"property float x\nproperty float y\nproperty float z\n"
+                    b"element face 0\nproperty list uchar int vertex_indices\nend_header\n")
+            vertices.tofile(f)
+        np.testing.assert_array_equal(split_vertices(load_ply(path))[0], self.points[:2])
+
+    def test_npy_round_trip(self):
+        path = os.path.join(self.tmp.name, 'cloud.npy')
+        self.assertEqual(save_npy(self.points, self.colors, path), 100)
+
+        vertices = load_pointcloud(path)
+        self.assertIsInstance(vertices, np.memmap)
+        np.testing.assert_array_equal(vertices['red'], self.colors[:, 0])
+
+    def test_rejects_non_ply(self):
+        path = os.path.join(self.tmp.name, 'cloud.ply')
+        with open(path, 'wb') as f:
+            f.write(b"not a ply\n")
+        with self.assertRaises(ValueError):
+            load_ply(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "depth-anything-v3-marine"))
+from pointcloud_projector import PointCloudProjector, get_projector
+
+
+def _reference(depth_map, rgb_image, step, depth_scale, min_depth, max_depth):
+    h, w = depth_map.shape
+    fx = fy = min(w, h) * 0.7
+    cx, cy = w // 2, h // 2
+    u, v = np.meshgrid(np.arange(0, w, step), np.arange(0, h, step))
+    z = depth_map[::step, ::step].astype(np.float32) / 255.0 * depth_scale
+    x = (u - cx) * z / fx
+    y = (v - cy) * z / fy
+    points = np.stack([x.flatten(), y.flatten(), z.flatten()], axis=1)
+    valid = (z.flatten() > min_depth) & (z.flatten() < max_depth)
+    return points[valid], rgb_image[::step, ::step].reshape(-1, 3)[valid]
+
+
+class TestPointCloudProjector(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.depth = rng.integers(0, 256, (90, 121), dtype=np.uint8)
+        self.rgb = rng.integers(0, 256, (90, 121, 3), dtype=np.uint8)
+
+    def test_matches_meshgrid_unprojection(self):
+        for stride, scale, near, far in [(1, 10.0, 0.1, 8.0), (4, 8.0, 0.2, 6.0)]:
+            projector = PointCloudProjector(121, 90, stride=stride, depth_scale=scale, min_depth=near, max_depth=far)
+            points, colors = projector.project(self.depth, self.rgb)
+            expected_points, expected_colors = _reference(self.depth, self.rgb, stride, scale, near, far)
+            np.testing.assert_allclose(points, expected_points, rtol=1e-6, atol=1e-6)
+            np.testing.assert_array_equal(colors, expected_colors)
+
+    def test_float_depth_and_no_colors(self):
+        projector = PointCloudProjector(121, 90)
+        points, colors = projector.project(self.depth.astype(np.float32))
+        self.assertIsNone(colors)
+        np.testing.assert_allclose(points, _reference(self.depth, self.rgb, 1, 10.0, 0.1, 8.0)[0], rtol=1e-6, atol=1e-6)
+
+    def test_buffers_are_reused(self):
+        projector = get_projector(121, 90, stride=2)
+        self.assertIs(projector, get_projector(121, 90, stride=2))
+        first, _ = projector.project(self.depth)
+        second, _ = projector.project(self.depth[::-1])
+        self.assertTrue(np.shares_memory(first, second))
+
+        with self.assertRaises(ValueError):
+            projector.project(self.depth[:, :60])
+
+
+if __name__ == '__main__':
+    unittest.main()
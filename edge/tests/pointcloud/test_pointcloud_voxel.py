@@ -0,0 +1,60 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "depth-anything-v3-marine"))
+from pointcloud_voxel import VoxelGrid, voxel_downsample
+
+
+class TestVoxelGrid(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.points = rng.uniform(-1, 1, (5000, 3)).astype(np.float32)
+        self.colors = rng.integers(0, 256, (5000, 3), dtype=np.uint8)
+
+    def test_one_centroid_per_voxel(self):
+        points = np.array([[0.01, 0.01, 0.01], [0.03, 0.03, 0.03], [0.15, 0.0, 0.0], [-0.05, 0.0, 0.0]])
+        colors = np.array([[0, 0, 0], [10, 20, 30], [255, 255, 255], [1, 2, 3]], dtype=np.uint8)
+
+        down, down_colors = voxel_downsample(points, colors, voxel_size=0.1)
+        order = np.argsort(down[:, 0])
+        np.testing.assert_allclose(down[order], [[-0.05, 0, 0], [0.02, 0.02, 0.02], [0.15, 0, 0]], atol=1e-6)
+        np.testing.assert_array_equal(down_colors[order], [[1, 2, 3], [5, 10, 15], [255, 255, 255]])
+
+    def test_uniform_density(self):
+        down, _ = voxel_downsample(self.points, voxel_size=0.5)
+        self.assertEqual(len(down), 64)
+        keys = np.floor(down / 0.5)
+        self.assertEqual(len(np.unique(keys, axis=0)), 64)
+
+    def test_fusing_frames_matches_one_pass(self):
+        fused = VoxelGrid(0.1)
+        for start in range(0, 5000, 1000):
+            fused.merge(VoxelGrid(0.1).add(self.points[start:start + 1000], self.colors[start:start + 1000]))
+        expected = voxel_downsample(self.points, self.colors, 0.1)
+
+        for actual, reference in zip(fused.to_arrays(), expected):
+            self.assertEqual(len(actual), len(reference))
+            np.testing.assert_allclose(actual[np.lexsort(actual.T)], reference[np.lexsort(reference.T)], atol=1e-5)
+
+    def test_max_points_coarsens_voxels(self):
+        grid = VoxelGrid(0.1, max_points=100)
+        grid.add(self.points, self.colors)
+        self.assertLessEqual(len(grid), 100)
+        self.assertEqual(grid.voxel_size, 0.8)
+        self.assertEqual(len(grid), len(voxel_downsample(self.points, voxel_size=0.8)[0]))
+
+        with self.assertRaises(ValueError):
+            grid.merge(VoxelGrid(0.3))
+
+    def test_pose_moves_points(self):
+        pose = np.eye(4)
+        pose[:3, 3] = [10, 0, 0]
+        points, _ = VoxelGrid(0.5).add(self.points, pose=pose).to_arrays()
+        self.assertGreater(points[:, 0].min(), 8.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from export_results import DetectionColumns, ResultsExporter, SummaryAccumulator
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:
+    pyarrow = None
+
+STATS = {'cpu_percent': 10.0, 'memory_percent': 20.0}
+
+
+def _frame(n, predictions, **extra):
+    return {'frame_number': n, 'timestamp': f"t{n}", 'predictions': predictions, 'system_stats': STATS, **extra}
+
+
+def _pred(cls, confidence, track_id=None):
+    pred = {'class': cls, 'confidence': confidence, 'x': 0.5, 'y': 0.5, 'width': 0.1, 'height': 0.2}
+    if track_id is not None:
+        pred['track_id'] = track_id
+    return pred
+
+
+FRAMES = [
+    _frame(0, [_pred('fish', 0.9, track_id=1), _pred('coral', 0.4)]),
+    _frame(1, []),
+    _frame(2, [_pred('fish', 0.8, track_id=1)], interpolated=True)
+]
+
+
+class TestDetectionColumns(unittest.TestCase):
+    def test_rows_match_csv_layout(self):
+        columns = DetectionColumns(FRAMES)
+
+        self.assertEqual(len(columns), 4)
+        self.assertEqual(columns.columns['frame_number'].tolist(), [0, 0, 1, 2])
+        self.assertEqual(columns.columns['detection_index'].tolist(), [0, 1, -1, 0])
+        self.assertEqual(columns.columns['detection_count'].tolist(), [2, 2, 0, 1])
+        self.assertEqual([columns.classes[c] if c >= 0 else None for c in columns.columns['class']],
+                         ['fish', 'coral', None, 'fish'])
+        self.assertEqual(columns.columns['track_id'].tolist(), [1, -1, -1, 1])
+        self.assertEqual(columns.columns['interpolated'].tolist(), [False, False, False, True])
+
+    def test_empty_results(self):
+        columns = DetectionColumns([])
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(len(columns.columns['class']), 0)
+
+
+class TestSummary(unittest.TestCase):
+    def _statistics(self, frames, fps, chunk_frames=100):
+        summary = SummaryAccumulator(fps)
+        for columns in DetectionColumns.chunks(frames, chunk_frames):
+            summary.add(columns)
+        return summary.statistics()
+
+    def test_statistics_exclude_interpolated_frames(self):
+        stats = self._statistics(FRAMES, fps=1.0)
+
+        self.assertEqual(stats['total_frames'], 2)
+        self.assertEqual(stats['total_detections'], 2)
+        self.assertEqual(stats['detection_by_class'], {'fish': 1, 'coral': 1})
+        self.assertEqual(stats['unique_individuals_by_class'], {'fish': 1})
+        self.assertEqual(stats['confidence_by_class']['fish']['p50'], 0.9)
+        self.assertEqual(stats['detections_per_minute'], 60.0)
+        self.assertEqual(stats['detections_per_second'], [
+            {'second': 0, 'frames': 1, 'detections': 2},
+            {'second': 1, 'frames': 1, 'detections': 0}
+        ])
+
+    def test_chunked_matches_single_pass(self):
+        frames = [
+            _frame(n, [_pred('fish' if n % 3 else 'coral', (n % 10) / 10, track_id=n % 4)] * (n % 3))
+            for n in range(50)
+        ]
+        self.assertEqual(self._statistics(frames, fps=5.0, chunk_frames=7),
+                         self._statistics(frames, fps=5.0, chunk_frames=50))
+
+    def test_empty_results(self):
+        stats = self._statistics([], fps=30.0)
+        self.assertEqual(stats['total_frames'], 0)
+        self.assertIsNone(stats['avg_cpu_usage'])
+        self.assertEqual(stats['detections_per_second'], [])
+
+
+class TestStreamingExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = Path(self.tmp.name) / "dive_results.json"
+        with open(self.input_path, 'w') as f:
+            json.dump({'video_info': {'path': '/videos/dive.mp4', 'fps': 1.0}, 'processing_info': {},
+                       'frame_results': FRAMES}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_csv_written_in_chunks(self):
+        ResultsExporter(self.input_path, self.tmp.name).export_all(['csv'], chunk_frames=1)
+
+        with open(Path(self.tmp.name) / "dive_results_detections.csv") as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith('frame_number,timestamp,'))
+        self.assertEqual(lines[3], 't1,'.join(['1,', '10.0,20.0,0,False,,,,,,,,']))
+        with open(Path(self.tmp.name) / "dive_results_summary.json") as f:
+            self.assertEqual(json.load(f)['statistics']['total_detections'], 2)
+
+
+@unittest.skipIf(pyarrow is None, "pyarrow is not installed")
+class TestParquetExport(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.input_path = Path(self.tmp.name) / "dive_results.json"
+        with open(self.input_path, 'w') as f:
+            json.dump({'video_info': {'path': '/videos/dive.mp4'}, 'processing_info': {}, 'frame_results': FRAMES}, f)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_typed_partitioned_dataset(self):
+        exporter = ResultsExporter(self.input_path, self.tmp.name)
+        exporter.export_parquet(exporter.load_results(), chunk_frames=2)
+
+        part = Path(self.tmp.name) / 'detections' / 'video=dive' / 'part-0.parquet'
+        table = pq.read_table(part)
+        self.assertEqual(table.schema.field('frame_number').type, pyarrow.int32())
+        self.assertEqual(table.schema.field('x').type, pyarrow.float32())
+        self.assertTrue(pyarrow.types.is_dictionary(table.schema.field('class').type))
+        self.assertEqual(table.column('class').to_pylist(), ['fish', 'coral', None, 'fish'])
+        self.assertEqual(table.column('track_id').to_pylist(), [1, None, None, 1])
+        self.assertEqual(table.column('confidence').null_count, 1)
+
+        # The detections directory reads back as one dataset with a video column
+        dataset = pq.read_table(Path(self.tmp.name) / 'detections')
+        self.assertEqual(set(dataset.column('video').to_pylist()), {'dive'})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,142 @@
+import unittest
+import sys
+import os
+import random
+import threading
+import time
+
+import numpy as np
+
+# Add scripts directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from frame_pipeline import FramePipeline
+
+class TestFramePipeline(unittest.TestCase):
+    def _frames(self, count):
+        for i in range(count):
+            yield i, np.full((4, 4, 3), i % 256, dtype=np.uint8)
+
+    def test_results_are_returned_in_frame_order(self):
+        """Out-of-order completion is reassembled by frame number."""
+        def process(frame, frame_number):
+            time.sleep(random.uniform(0, 0.005))
+            return {'frame_number': frame_number, 'value': int(frame[0, 0, 0])}
+
+        pipeline = FramePipeline(process, num_workers=4, frame_queue_size=4, result_queue_size=4)
+        results = list(pipeline.run(self._frames(200)))
+
+        self.assertEqual([n for n, _ in results], list(range(200)))
+        self.assertEqual([r['value'] for _, r in results], [i % 256 for i in range(200)])
+
+    def test_failed_frames_keep_their_slot(self):
+        """A None result from process_fn does not stall the collector."""
+        pipeline = FramePipeline(lambda frame, n: None if n % 3 == 0 else {'n': n}, num_workers=2)
+        results = list(pipeline.run(self._frames(30)))
+
+        self.assertEqual(len(results), 30)
+        self.assertIsNone(results[0][1])
+        self.assertEqual(results[1][1], {'n': 1})
+
+    def test_batches_are_filled_and_flushed(self):
+        """Frames are grouped up to batch_size and tail frames are not lost."""
+        batch_sizes = []
+
+        def process_batch(frames, frame_numbers):
+            batch_sizes.append(len(frames))
+            return [{'n': n} for n in frame_numbers]
+
+        pipeline = FramePipeline(lambda frame, n: {'n': n}, num_workers=2,
+                                 batch_fn=process_batch, batch_size=8, max_batch_latency=0.5)
+        results = list(pipeline.run(self._frames(50)))
+
+        self.assertEqual([r['n'] for _, r in results], list(range(50)))
+        self.assertLessEqual(max(batch_sizes), 8)
+        self.assertGreater(max(batch_sizes), 1)
+
+    def test_partial_batch_flushes_after_latency(self):
+        """A slow decoder does not hold frames longer than max_batch_latency."""
+        def slow_frames():
+            for i in range(3):
+                time.sleep(0.1)
+                yield i, np.zeros((2, 2, 3), dtype=np.uint8)
+
+        batch_sizes = []
+
+        def process_batch(frames, frame_numbers):
+            batch_sizes.append(len(frames))
+            return [{} for _ in frames]
+
+        pipeline = FramePipeline(lambda frame, n: batch_sizes.append(1) or {}, num_workers=1,
+                                 batch_fn=process_batch, batch_size=16, max_batch_latency=0.01)
+        self.assertEqual(len(list(pipeline.run(slow_frames()))), 3)
+        self.assertEqual(batch_sizes, [1, 1, 1])
+
+    def test_worker_exception_is_raised(self):
+        """Unhandled worker errors propagate to the caller."""
+        def process(frame, frame_number):
+            if frame_number == 10:
+                raise ValueError("boom")
+            return {}
+
+        pipeline = FramePipeline(process, num_workers=3)
+        with self.assertRaises(ValueError):
+            list(pipeline.run(self._frames(100)))
+
+    def _run_with_timeout(self, pipeline, frames, timeout=5.0):
+        """Run the pipeline in a thread so a hang fails the test instead of the suite."""
+        outcome = {}
+
+        def consume():
+            try:
+                outcome['results'] = list(pipeline.run(frames))
+            except BaseException as e:
+                outcome['error'] = e
+
+        thread = threading.Thread(target=consume, daemon=True)
+        thread.start()
+        thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "pipeline did not finish")
+        return outcome
+
+    def test_single_worker_exception_is_raised(self):
+        """The only worker failing does not leave the collector waiting."""
+        def process(frame, frame_number):
+            raise ValueError("boom")
+
+        outcome = self._run_with_timeout(FramePipeline(process, num_workers=1), self._frames(20))
+        self.assertIsInstance(outcome.get('error'), ValueError)
+
+    def test_worker_base_exception_is_raised(self):
+        """A worker dying from a BaseException still reports back."""
+        class Abort(BaseException):
+            pass
+
+        def process(frame, frame_number):
+            if frame_number == 3:
+                raise Abort()
+            return {}
+
+        outcome = self._run_with_timeout(FramePipeline(process, num_workers=2), self._frames(50))
+        self.assertIsInstance(outcome.get('error'), Abort)
+
+    def test_decoder_exception_is_raised(self):
+        """An error while reading frames ends the run instead of hanging it."""
+        def frames():
+            yield 0, np.zeros((2, 2, 3), dtype=np.uint8)
+            raise IOError("read failed")
+
+        outcome = self._run_with_timeout(FramePipeline(lambda frame, n: {}, num_workers=1), frames())
+        self.assertIsInstance(outcome.get('error'), IOError)
+
+    def test_early_close_stops_threads(self):
+        """Closing the result iterator shuts the pipeline down."""
+        pipeline = FramePipeline(lambda frame, n: {}, num_workers=2, frame_queue_size=2, result_queue_size=2)
+        results = pipeline.run(self._frames(10000))
+        next(results)
+        results.close()
+        time.sleep(0.3)
+        names = [t.name for t in threading.enumerate()]
+        self.assertFalse(any(n.startswith('inference-worker') or n == 'frame-decoder' for n in names))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+import sys
+import os
+
+import cv2
+import numpy as np
+
+# Add scripts directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from frame_sampler import FrameSampler
+
+class FakeCapture:
+    """Minimal cv2.VideoCapture stand-in that counts decode calls."""
+
+    def __init__(self, frame_count):
+        self.frame_count = frame_count
+        self.position = 0
+        self.grabs = 0
+        self.reads = 0
+        self.seeks = 0
+
+    def grab(self):
+        if self.position >= self.frame_count:
+            return False
+        self.grabs += 1
+        self.position += 1
+        return True
+
+    def read(self):
+        if self.position >= self.frame_count:
+            return False, None
+        self.reads += 1
+        frame = np.full((2, 2, 3), self.position % 256, dtype=np.uint8)
+        self.position += 1
+        return True, frame
+
+    def set(self, prop, value):
+        if prop != cv2.CAP_PROP_POS_FRAMES:
+            return False
+        self.seeks += 1
+        self.position = int(value)
+        return True
+
+class TestFrameSampler(unittest.TestCase):
+    def test_fps_limit_grabs_skipped_frames(self):
+        """At 30 -> 5 fps only every sixth frame is decoded."""
+        sampler = FrameSampler(30.0, fps_limit=5)
+        cap = FakeCapture(60)
+        indices = [n for n, _ in sampler.frames(cap)]
+
+        self.assertEqual(sampler.policy, 'grab')
+        self.assertEqual(indices, list(range(0, 60, 6)))
+        self.assertEqual(cap.reads, 10)
+        self.assertEqual(cap.grabs, 50)
+
+    def test_non_integer_ratio_does_not_drift(self):
+        """29.97 fps sampled at 5 fps stays aligned to wall-clock time."""
+        sampler = FrameSampler(29.97, fps_limit=5)
+        indices = [n for n, _ in sampler.frames(FakeCapture(30000))]
+
+        self.assertAlmostEqual(indices[-1] / 29.97, (len(indices) - 1) / 5.0, delta=1 / 29.97)
+
+    def test_large_stride_seeks(self):
+        """Strides above seek_stride jump directly to the target frame."""
+        sampler = FrameSampler(30.0, fps_limit=0.25, seek_stride=60)
+        cap = FakeCapture(600)
+        indices = [n for n, _ in sampler.frames(cap)]
+
+        self.assertEqual(sampler.policy, 'seek')
+        self.assertEqual(indices, list(range(0, 600, 120)))
+        self.assertEqual(cap.grabs, 0)
+        self.assertEqual(cap.reads, 5)
+
+    def test_no_limit_reads_every_frame(self):
+        """Without a usable fps limit every frame is returned."""
+        for sampler in (FrameSampler(30.0, fps_limit=None), FrameSampler(30.0, fps_limit=60), FrameSampler(0, fps_limit=5)):
+            self.assertEqual(sampler.policy, 'all')
+            self.assertEqual(len(list(sampler.frames(FakeCapture(25)))), 25)
+
+if __name__ == '__main__':
+    unittest.main()
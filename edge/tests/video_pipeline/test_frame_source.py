@@ -0,0 +1,89 @@
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from frame_sampler import FrameSampler
+from frame_source import FFmpegSource, OpenCVSource, open_frame_source
+
+
+class TestFrameSource(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.mkdtemp()
+        cls.path = os.path.join(cls.tmp, 'clip.avi')
+        writer = cv2.VideoWriter(cls.path, cv2.VideoWriter_fourcc(*'MJPG'), 10, (64, 48))
+        for i in range(30):
+            writer.write(np.full((48, 64, 3), i * 8, dtype=np.uint8))
+        writer.release()
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.tmp)
+
+    def test_iterates_index_pts_frame(self):
+        with OpenCVSource(self.path) as source:
+            items = list(source)
+
+        self.assertEqual([index for index, _, _ in items], list(range(30)))
+        self.assertAlmostEqual(items[10][1], 1.0, places=2)
+        self.assertEqual(items[0][2].shape, (48, 64, 3))
+        self.assertEqual((source.fps, source.frame_count, source.width, source.height), (10, 30, 64, 48))
+
+    def test_ffmpeg_backend_matches_opencv(self):
+        with OpenCVSource(self.path) as reference, FFmpegSource(self.path, threads=2) as source:
+            for (_, _, expected), (_, _, frame) in zip(reference, source):
+                np.testing.assert_array_equal(frame, expected)
+            self.assertEqual(source.describe()['threads'], 2)
+
+    def test_seek(self):
+        with open_frame_source(self.path) as source:
+            self.assertTrue(source.set(cv2.CAP_PROP_POS_FRAMES, 20))
+            index, _, _ = next(iter(source))
+        self.assertEqual(index, 20)
+
+    def test_sampler_accepts_frame_source(self):
+        with open_frame_source(self.path, {'backend': 'ffmpeg'}) as source:
+            indices = [n for n, _ in FrameSampler(10, fps_limit=2).frames(source)]
+        self.assertEqual(indices, [0, 5, 10, 15, 20, 25])
+
+    def test_unusable_backend_falls_back_to_opencv(self):
+        source = open_frame_source(self.path, {'backend': 'gstreamer', 'gstreamer_pipeline': 'nosuchelement ! appsink'})
+        self.assertEqual(source.describe()['backend'], 'opencv')
+        source.release()
+
+        with self.assertRaises(ValueError):
+            open_frame_source(self.path, {'backend': 'vlc'})
+
+    def test_output_size_keeps_aspect_ratio(self):
+        with open_frame_source(self.path, {'width': 32, 'pixel_format': 'gray'}) as source:
+            _, frame = source.read()
+        self.assertEqual(source.frame_size, (32, 24))
+        self.assertEqual(frame.shape, (24, 32))
+        self.assertEqual((source.width, source.height), (64, 48))
+
+    def test_released_buffers_are_reused(self):
+        for decode_config in ({'width': 32, 'height': 24}, {}):
+            with open_frame_source(self.path, decode_config, buffers=8) as source:
+                ids = set()
+                for _ in range(20):
+                    ids.add(id(source.read()[1]))
+                # Each frame was dropped before the next read, so one buffer served them all
+                self.assertEqual(len(source._ring), 1)
+                self.assertEqual(ids, {id(source._ring[0])})
+
+    def test_held_frames_are_not_overwritten(self):
+        with open_frame_source(self.path, {'width': 32, 'height': 24}, buffers=2) as source:
+            frames = [source.read()[1] for _ in range(3)]
+            self.assertEqual(len(source._ring), 2)
+        self.assertEqual(len({id(frame) for frame in frames}), 3)
+        for i, frame in enumerate(frames):
+            self.assertAlmostEqual(frame.mean(), i * 8, delta=3)
+
+if __name__ == '__main__':
+    unittest.main()
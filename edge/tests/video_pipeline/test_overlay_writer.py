@@ -0,0 +1,54 @@
+import os
+import sys
+import tempfile
+import unittest
+
+import cv2
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+
+from overlay_writer import AnnotatedVideoWriter, draw_predictions, prediction_boxes
+
+OVERLAY = {'show_fps': True, 'show_detections': True, 'show_system_stats': True}
+STATS = {'cpu_percent': 10.0, 'memory_percent': 20.0}
+
+
+class TestOverlayDrawing(unittest.TestCase):
+    def test_prediction_boxes(self):
+        boxes = prediction_boxes([{'x': 0.5, 'y': 0.5, 'width': 0.2, 'height': 0.5}], (100, 200, 3))
+        np.testing.assert_array_equal(boxes, [[80, 25, 120, 75]])
+        self.assertEqual(prediction_boxes([], (100, 200, 3)).shape, (0, 4))
+
+    def test_draw_predictions_colors_by_confidence(self):
+        frame = np.zeros((100, 200, 3), dtype=np.uint8)
+        draw_predictions(frame, [
+            {'x': 0.25, 'y': 0.5, 'width': 0.2, 'height': 0.4, 'confidence': 0.9, 'class': 'fish'},
+            {'x': 0.75, 'y': 0.5, 'width': 0.2, 'height': 0.4, 'confidence': 0.3, 'class': 'fish'}
+        ])
+        # Left edges of the two boxes
+        self.assertEqual(tuple(frame[50, 30]), (0, 255, 0))
+        self.assertEqual(tuple(frame[50, 130]), (0, 255, 255))
+
+
+class TestAnnotatedVideoWriter(unittest.TestCase):
+    def test_writes_every_frame(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'annotated.mp4')
+            with AnnotatedVideoWriter(path, 5.0, (64, 48), OVERLAY) as writer:
+                for frame_number in range(6):
+                    writer.write(np.zeros((48, 64, 3), dtype=np.uint8), {
+                        'frame_number': frame_number,
+                        'predictions': [{'x': 0.5, 'y': 0.5, 'width': 0.5, 'height': 0.5,
+                                         'confidence': 0.9, 'class': 'fish', 'track_id': 1}],
+                        'system_stats': STATS
+                    })
+            self.assertEqual(writer.frames_written, 6)
+
+            cap = cv2.VideoCapture(path)
+            self.assertEqual(int(cap.get(cv2.CAP_PROP_FRAME_COUNT)), 6)
+            cap.release()
+
+
+if __name__ == '__main__':
+    unittest.main()
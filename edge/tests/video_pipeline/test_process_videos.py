@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+# Add scripts directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from result_writer import JsonlResultWriter
+
+try:
+    import process_video
+except ImportError:
+    process_video = None
+
+CONFIG_PATH = Path(__file__).resolve().parents[2] / "configs" / "default_config.yaml"
+
+
+@unittest.skipIf(process_video is None, "process_video dependencies (inference_sdk) not installed")
+class TestProcessVideos(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self.tmp.name)
+        with open(CONFIG_PATH) as f:
+            config = yaml.safe_load(f)
+        config['video']['output_path'] = str(self.root / "output")
+        config['system']['temp_directory'] = str(self.root / "tmp")
+        config['system']['log_level'] = 'WARNING'
+        # Workers fail their resource check instead of running inference
+        config['system']['min_cpu_cores'] = 1_000_000
+        self.config_path = self.root / "config.yaml"
+        with open(self.config_path, 'w') as f:
+            yaml.safe_dump(config, f)
+        self.processor = process_video.VideoProcessor(str(self.config_path))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _video(self, name, mtime):
+        path = self.root / name
+        path.write_bytes(b'')
+        os.utime(path, (mtime, mtime))
+        return str(path)
+
+    def _results(self, video_path, mtime, footer=True):
+        results_path, _ = self.processor.results_paths(video_path)
+        writer = JsonlResultWriter(results_path)
+        writer.write_header({'path': video_path}, {})
+        if footer:
+            writer.write_footer(end_time='end')
+        writer.close()
+        os.utime(results_path, (mtime, mtime))
+
+    def test_results_up_to_date(self):
+        video = self._video("video.mp4", 1000)
+        self.assertFalse(self.processor.results_up_to_date(video))
+
+        self._results(video, 2000)
+        self.assertTrue(self.processor.results_up_to_date(video))
+
+        # The video changed after its results were written
+        os.utime(video, (3000, 3000))
+        self.assertFalse(self.processor.results_up_to_date(video))
+
+    def test_incomplete_results_are_not_up_to_date(self):
+        video = self._video("video.mp4", 1000)
+        self._results(video, 2000, footer=False)
+        self.assertFalse(self.processor.results_up_to_date(video))
+
+        self._results(video, 2000)
+        _, checkpoint_path = self.processor.results_paths(video)
+        checkpoint_path.write_text('{}')
+        self.assertFalse(self.processor.results_up_to_date(video))
+
+    def test_only_stale_videos_are_reprocessed(self):
+        fresh = self._video("fresh.mp4", 1000)
+        self._results(fresh, 2000)
+        stale = self._video("stale.mp4", 3000)
+        self._results(stale, 2000)
+        new = self._video("new.mp4", 1000)
+
+        with mock.patch.object(process_video, '_process_video_task', return_value='processed') as task:
+            status = self.processor.process_videos([fresh, stale, new], workers=1)
+
+        self.assertEqual(status, {fresh: 'skipped', stale: 'processed', new: 'processed'})
+        self.assertEqual([call.args[1] for call in task.call_args_list], [stale, new])
+
+    def test_videos_fan_out_to_worker_processes(self):
+        fresh = self._video("fresh.mp4", 1000)
+        self._results(fresh, 2000)
+        pending = [self._video(f"video{i}.mp4", 1000) for i in range(3)]
+
+        with mock.patch.object(process_video, 'ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+            status = self.processor.process_videos([fresh] + pending, workers=2)
+
+        pool.assert_called_once_with(max_workers=2)
+        self.assertEqual(status[fresh], 'skipped')
+        # Every pending video reports the status its worker returned
+        for video in pending:
+            self.assertEqual(status[video], 'failed: System requirements not met')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,145 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+
+# Add scripts directory to path for imports
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+from result_writer import JsonlResultWriter, JsonlResults, JsonResults, jsonl_to_json, load_checkpoint
+
+class TestJsonlResults(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "video_results.jsonl"
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _write(self, frames, footer=True):
+        writer = JsonlResultWriter(self.path, fsync_interval=2)
+        writer.write_header({'path': 'video.mp4', 'start_time': 'start'}, {'model_id': 'm'})
+        for n in range(frames):
+            writer.write_frame({'frame_number': n, 'predictions': [{'class': 'fish'}] * n})
+        if footer:
+            writer.write_footer(end_time='end')
+        writer.close()
+
+    def test_round_trip(self):
+        """Header, frames and footer are read back in the JSON layout."""
+        self._write(5)
+        results = JsonlResults(self.path).to_results()
+
+        self.assertEqual(results['video_info'], {'path': 'video.mp4', 'start_time': 'start', 'end_time': 'end'})
+        self.assertEqual(results['processing_info'], {'model_id': 'm'})
+        self.assertEqual(len(results['frame_results']), 5)
+        self.assertEqual([f['frame_number'] for f in results['frame_results']], list(range(5)))
+        # Frames can be streamed more than once
+        self.assertEqual(sum(len(f['predictions']) for f in results['frame_results']), 10)
+
+    def test_shared_stats_are_written_once(self):
+        """Frames referencing the same stats sample share one stored record."""
+        samples = [{'sample_id': i, 'cpu_percent': 10.0 * i, 'memory_percent': 50.0} for i in range(2)]
+        writer = JsonlResultWriter(self.path)
+        writer.write_header({}, {})
+        for n in range(6):
+            writer.write_frame({'frame_number': n, 'predictions': [], 'system_stats': samples[n // 3]})
+        writer.close()
+
+        with open(self.path) as f:
+            kinds = [json.loads(line)['record'] for line in f]
+        self.assertEqual(kinds.count('system_stats'), 2)
+
+        frames = list(JsonlResults(self.path))
+        self.assertEqual(frames[4]['system_stats']['cpu_percent'], 10.0)
+        self.assertNotIn('stats_id', frames[0])
+
+    def test_truncated_tail_is_ignored(self):
+        """A partial last line from a crashed run does not break reading."""
+        self._write(3, footer=False)
+        with open(self.path, 'a') as f:
+            f.write('{"record":"frame","frame_nu')
+
+        results = JsonlResults(self.path)
+        self.assertEqual(len(results), 3)
+        self.assertNotIn('end_time', results.video_info)
+
+    def test_resume_truncates_to_checkpoint(self):
+        """Records written after the last checkpoint are dropped on resume."""
+        checkpoint_path = Path(self.tmp.name) / "video_results.checkpoint.json"
+        writer = JsonlResultWriter(self.path, fsync_interval=3, checkpoint_path=checkpoint_path)
+        writer.write_header({'path': 'video.mp4'}, {})
+        for n in range(5):
+            writer.write_frame({'frame_number': n * 10, 'predictions': []})
+        writer.write_footer(end_time='crashed')
+        writer.close()
+
+        checkpoint = load_checkpoint(checkpoint_path)
+        self.assertEqual(checkpoint['last_frame_number'], 20)
+        self.assertEqual(checkpoint['frames_written'], 3)
+
+        writer = JsonlResultWriter(self.path, checkpoint_path=checkpoint_path, resume_from=checkpoint)
+        writer.write_resume(30)
+        writer.write_frame({'frame_number': 30, 'predictions': []})
+        writer.write_footer(end_time='end')
+        writer.close()
+        writer.remove_checkpoint()
+
+        results = JsonlResults(self.path)
+        self.assertEqual([f['frame_number'] for f in results], [0, 10, 20, 30])
+        self.assertEqual(results.footer['frames_written'], 4)
+        self.assertEqual(results.video_info['end_time'], 'end')
+        self.assertFalse(checkpoint_path.exists())
+
+    def test_unsynced_frames_defer_the_checkpoint(self):
+        """A sync due on a sync=False frame waits for the next synced frame."""
+        checkpoint_path = Path(self.tmp.name) / "video_results.checkpoint.json"
+        writer = JsonlResultWriter(self.path, fsync_interval=2, checkpoint_path=checkpoint_path)
+        writer.write_header({'path': 'video.mp4'}, {})
+        checkpoint_path.unlink()
+        for n in range(3):
+            writer.write_frame({'frame_number': n, 'predictions': [], 'interpolated': True}, sync=False)
+        self.assertFalse(checkpoint_path.exists())
+
+        writer.write_frame({'frame_number': 3, 'predictions': []})
+        writer.close()
+        self.assertEqual(load_checkpoint(checkpoint_path)['last_frame_number'], 3)
+
+    def test_jsonl_to_json(self):
+        """The single-document JSON matches the streamed records."""
+        self._write(4)
+        json_path = Path(self.tmp.name) / "video_results.json"
+        jsonl_to_json(self.path, json_path)
+
+        with open(json_path) as f:
+            data = json.load(f)
+        self.assertEqual(data['video_info']['end_time'], 'end')
+        self.assertEqual([f['frame_number'] for f in data['frame_results']], list(range(4)))
+        self.assertNotIn('record', data['frame_results'][0])
+
+    def test_json_results_stream_frames(self):
+        """The JSON reader decodes frames across chunk boundaries."""
+        self._write(6)
+        json_path = Path(self.tmp.name) / "video_results.json"
+        jsonl_to_json(self.path, json_path)
+        with open(json_path) as f:
+            data = json.load(f)
+
+        results = JsonResults(json_path, chunk_size=5)
+        self.assertEqual(results.video_info, data['video_info'])
+        self.assertEqual(results.processing_info, {'model_id': 'm'})
+        self.assertEqual(list(results), data['frame_results'])
+
+    def test_json_results_info_after_frames(self):
+        json_path = Path(self.tmp.name) / "video_results.json"
+        with open(json_path, 'w') as f:
+            json.dump({'frame_results': [{'frame_number': 0}], 'video_info': {'fps': 30}}, f)
+
+        results = JsonResults(json_path, chunk_size=4)
+        self.assertEqual(results.video_info, {'fps': 30})
+        self.assertEqual(results.processing_info, {})
+        self.assertEqual(list(results), [{'frame_number': 0}])
+
+if __name__ == '__main__':
+    unittest.main()
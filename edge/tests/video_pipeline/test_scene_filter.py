@@ -0,0 +1,61 @@
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+
+from scene_filter import SceneChangeFilter
+
+
+def frames(*values, shape=(72, 128, 3)):
+    for frame_number, value in enumerate(values):
+        yield frame_number, np.full(shape, value, dtype=np.uint8)
+
+
+class TestSceneChangeFilter(unittest.TestCase):
+    def test_static_frames_reuse_reference(self):
+        scene_filter = SceneChangeFilter(threshold=0.02)
+        list(scene_filter.tag(frames(100, 101, 102, 200, 200)))
+
+        self.assertIsNone(scene_filter.reference_for(0))
+        self.assertEqual(scene_filter.reference_for(1), 0)
+        self.assertEqual(scene_filter.reference_for(2), 0)
+        self.assertIsNone(scene_filter.reference_for(3))
+        self.assertEqual(scene_filter.reference_for(4), 3)
+        self.assertEqual((scene_filter.inferred, scene_filter.reused), (2, 3))
+
+    def test_max_reuse_forces_inference(self):
+        scene_filter = SceneChangeFilter(threshold=0.02, max_reuse=2)
+        list(scene_filter.tag(frames(*[50] * 5)))
+
+        references = [scene_filter.reference_for(n) for n in range(5)]
+        self.assertEqual(references, [None, 0, 0, None, 3])
+
+    def test_histogram_method(self):
+        scene_filter = SceneChangeFilter(threshold=0.1, method='histogram')
+        list(scene_filter.tag(frames(10, 10, 250)))
+
+        self.assertEqual(scene_filter.reference_for(1), 0)
+        self.assertIsNone(scene_filter.reference_for(2))
+
+    def test_disabled_filter_infers_everything(self):
+        scene_filter = SceneChangeFilter(enabled=False)
+        list(scene_filter.tag(frames(*[50] * 3)))
+
+        self.assertTrue(all(scene_filter.reference_for(n) is None for n in range(3)))
+
+    def test_from_config(self):
+        scene_filter = SceneChangeFilter.from_config(
+            {'scene_filter': {'enabled': True, 'threshold': 0.05, 'method': 'histogram'}}
+        )
+        self.assertEqual(scene_filter.describe(),
+                         {'enabled': True, 'method': 'histogram', 'threshold': 0.05, 'max_reuse': 10})
+
+        with self.assertRaises(ValueError):
+            SceneChangeFilter(method='ssim')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import unittest
+
+import numpy as np
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "scripts"))
+
+from tracker import IoUTracker, iou_matrix
+
+
+def box(x, y, class_name='fish', size=0.1, confidence=0.9):
+    return {'x': x, 'y': y, 'width': size, 'height': size, 'class': class_name, 'confidence': confidence}
+
+
+class TestIoUMatrix(unittest.TestCase):
+    def test_iou_values(self):
+        a = np.array([[0.5, 0.5, 0.2, 0.2]])
+        b = np.array([[0.5, 0.5, 0.2, 0.2], [0.6, 0.5, 0.2, 0.2], [0.9, 0.9, 0.1, 0.1]])
+        np.testing.assert_allclose(iou_matrix(a, b), [[1.0, 1 / 3, 0.0]])
+
+
+class TestIoUTracker(unittest.TestCase):
+    def test_moving_object_keeps_its_id(self):
+        tracker = IoUTracker(min_hits=2)
+        ids = []
+        for step, frame_number in enumerate(range(0, 30, 6)):
+            tracked, _ = tracker.update(frame_number, [box(0.2 + 0.03 * step, 0.5)])
+            ids.append(tracked[0].get('track_id'))
+
+        self.assertIsNone(ids[0])
+        self.assertEqual(set(ids[1:]), {1})
+        self.assertEqual(tracker.unique_counts, {'fish': 1})
+
+    def test_classes_are_not_mixed(self):
+        tracker = IoUTracker(min_hits=1)
+        tracked, _ = tracker.update(0, [box(0.5, 0.5, 'fish'), box(0.5, 0.5, 'coral')])
+        tracked, _ = tracker.update(1, [box(0.5, 0.5, 'coral'), box(0.5, 0.5, 'fish')])
+
+        self.assertEqual(tracker.unique_counts, {'fish': 1, 'coral': 1})
+        self.assertNotEqual(tracked[0]['track_id'], tracked[1]['track_id'])
+
+    def test_interpolates_skipped_frames(self):
+        tracker = IoUTracker(min_hits=1)
+        tracker.update(0, [box(0.2, 0.5)])
+        tracked, gaps = tracker.update(4, [box(0.24, 0.5)])
+
+        self.assertEqual(sorted(gaps), [1, 2, 3])
+        self.assertAlmostEqual(gaps[2][0]['x'], 0.22)
+        self.assertEqual(gaps[2][0]['track_id'], tracked[0]['track_id'])
+
+    def test_lost_tracks_are_dropped(self):
+        tracker = IoUTracker(min_hits=1, max_age=1)
+        tracker.update(0, [box(0.2, 0.5)])
+        tracker.update(1, [])
+        tracker.update(2, [])
+        tracked, _ = tracker.update(3, [box(0.2, 0.5)])
+
+        self.assertNotIn('track_id', tracked[0])
+        self.assertEqual(len(tracker.tracks), 1)
+
+    def test_predictions_are_not_mutated(self):
+        tracker = IoUTracker(min_hits=1)
+        predictions = [box(0.5, 0.5)]
+        tracker.update(0, predictions)
+        tracker.update(1, predictions)
+
+        self.assertNotIn('track_id', predictions[0])
+
+    def test_state_round_trip(self):
+        tracker = IoUTracker(min_hits=2)
+        for step, frame_number in enumerate(range(0, 12, 6)):
+            tracker.update(frame_number, [box(0.2 + 0.03 * step, 0.5)])
+        state = json.loads(json.dumps(tracker.state()))
+
+        resumed = IoUTracker(min_hits=2)
+        resumed.load_state(state)
+        expected, expected_gaps = tracker.update(18, [box(0.26, 0.5)])
+        tracked, gaps = resumed.update(18, [box(0.26, 0.5)])
+
+        self.assertEqual(tracked, expected)
+        self.assertEqual(gaps, expected_gaps)
+        self.assertEqual(resumed.unique_counts, {'fish': 1})
+        self.assertEqual(resumed.next_id, tracker.next_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
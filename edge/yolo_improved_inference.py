@@ -2,9 +2,13 @@ from ultralytics import YOLO
 import cv2
 import argparse
 import os
+import sys
 import time
 
-def process_video(model_path, video_path=None, output_path=None, device=0, use_trt=True):
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "scripts"))
+from frame_source import open_frame_source
+
+def process_video(model_path, video_path=None, output_path=None, device=0, use_trt=True, decode_backend="opencv"):
     """
     Process a video with YOLO pose detection.
     
@@ -14,6 +18,7 @@ def process_video(model_path, video_path=None, output_path=None, device=0, use_t
         output_path (str, optional): Path to save the processed video. If None, doesn't save.
         device (int or str): Camera device number or video path.
         use_trt (bool): Whether to export and use TensorRT model.
+        decode_backend (str): Video decode backend (opencv, ffmpeg, pyav, gstreamer or auto).
     """
     # Load the YOLO model
     if use_trt and model_path.endswith('.pt'):
@@ -30,8 +35,9 @@ def process_video(model_path, video_path=None, output_path=None, device=0, use_t
     # Open the video source (file or camera)
     if video_path:
         print(f"Opening video file: {video_path}")
-        cap = cv2.VideoCapture(video_path)
-        if not cap.isOpened():
+        try:
+            cap = open_frame_source(video_path, {"backend": decode_backend})
+        except RuntimeError:
             print(f"Error: Could not open video file {video_path}")
             return
     else:
@@ -118,6 +124,9 @@ if __name__ == "__main__":
                         help="Camera device number (only used if no video path provided)")
     parser.add_argument("--no-trt", action="store_true", 
                         help="Disable TensorRT export and use PyTorch model directly")
+    parser.add_argument("--decode-backend", type=str, default="opencv",
+                        choices=["opencv", "ffmpeg", "pyav", "gstreamer", "auto"],
+                        help="Video decode backend for file input (auto uses the device default)")
     
     args = parser.parse_args()
     
@@ -126,5 +135,6 @@ if __name__ == "__main__":
         video_path=args.video,
         output_path=args.output,
         device=args.device,
-        use_trt=not args.no_trt
+        use_trt=not args.no_trt,
+        decode_backend=args.decode_backend
     )